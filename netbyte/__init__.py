@@ -6,8 +6,14 @@ import math
 import os
 import sys
 import importlib
+import builtins
+import mmap
+import types
+import contextlib
+import traceback
 
 from functools import reduce
+from operator import and_, or_, xor
 
 # Note that optional arguments default to None (Python) or NULLVL (Netbyte).
 
@@ -115,384 +121,1194 @@ EXPR_OPCODES = [
     "SPSCHR", # Char at Position : string, number -> string [length 1]
 ]
 
-class SpecialNull(object):
-    pass
+# Ids by name, for the parser and the dumper
+_BASE_ID = {name: i for i, name in enumerate(BASE_OPCODES)}
+_TYPE_ID = {name: i for i, name in enumerate(TYPES)}
+_EXPR_ID = {name: i for i, name in enumerate(EXPR_OPCODES)}
+
+# Execution Status Codes (returned by Instruction.execute as (code, payload) tuples)
+ST_SETRES = 1 # Set Result : the return value is in the return stack
+ST_TERMINATE = 2 # Terminate
+ST_JUMP = 3 # Jump : int position
+ST_LJUMP = 4 # Label Jump : string label key
+ST_LABEL = 5 # Mark Label : string label key
+ST_OJUMP = 6 # Offset Jump : int offset
+
+# Opcodes that can move the top-level position
+_FLOW_OPCODES = frozenset(("MLABEL", "JUMPIF", "JUMPIN", "JUMPLB", "JMPOFF", "GJUMPL"))
+
+# Opcodes whose handlers can return a status
+_STATUS_OPCODES = _FLOW_OPCODES | {"JUMPTO", "RETURN", "TERMIN"}
+
+# Binary Layouts
+_U32 = struct.Struct("=L") # length headers
+_U16 = struct.Struct("=H") # version header length
+_U8 = struct.Struct("=B")
+_F32 = struct.Struct("=f")
+_F64 = struct.Struct("=d")
+_LB = struct.Struct("=LB") # length, literal type
+_LBLB = struct.Struct("=LBLB") # expression length, literal marker, literal length, literal type
+_LBBOOL = struct.Struct("=LB?")
+_INT_STRUCTS = {struct.calcsize(f): struct.Struct("=" + f) for f in "bhiq"} # by width
+
+def _int_width(value):
+    # bytes needed with a sign bit, rounded up to a struct width
+    bits = (value if value >= 0 else ~value).bit_length() + 1
     
+    for width in (1, 2, 4, 8):
+        if bits <= width * 8:
+            return width
+            
+    return (bits + 7) // 8
     
-SPNULL = SpecialNull()
 
-def exvalue(expr, *args, **kwargs):
-    return expr.__value__(*args, **kwargs)
-        
-def dbgvalue(expr):
-    return expr.__debug_value__()
+# literal values with a body of their own; the rest dump as null markers
+_DUMPED_TYPES = frozenset((str, tuple, list, bool, int, float))
+
+# Fast Operators (take the evaluated operands)
+def _andnum(ops):
+    return reduce(and_, ops)
+    
+def _iornum(ops):
+    return reduce(or_, ops)
+    
+def _xornum(ops):
+    return reduce(xor, ops)
+    
+def _equals(ops):
+    if len(ops) < 2:
+        return True
         
-class Expression(object):
-    def __value__(self):
-        raise RuntimeError("Expression objects can't be used directly!")
+    first = ops[0]
+    
+    for v in ops[1:]:
+        if not v == first:
+            return False
+            
+    return True
+    
+def _differ(ops):
+    return not _equals(ops)
+    
+_FAST_OPS = {
+    "ANDNUM": _andnum,
+    "IORNUM": _iornum,
+    "XORNUM": _xornum,
+    "EQUALS": _equals,
+    "DIFFER": _differ,
+}
+
+# Arity-specialized Operators (take the Operation itself, and evaluate its
+# operand expressions directly, without building an operand list)
+def _binary_add(op):
+    # starts from 0 like _nary_add, so every arity agrees
+    return 0 + op._a.__value__() + op._b.__value__()
+    
+def _binary_mul(op):
+    return op._a.__value__() * op._b.__value__()
+    
+def _binary_sub(op):
+    return op._a.__value__() - op._b.__value__()
+    
+def _binary_div(op):
+    return op._a.__value__() / op._b.__value__()
+    
+def _binary_mod(op):
+    return op._a.__value__() % op._b.__value__()
+    
+def _binary_pow(op):
+    return math.pow(op._a.__value__(), op._b.__value__())
+    
+def _binary_rot(op):
+    return math.pow(op._a.__value__(), 1.0 / op._b.__value__())
+    
+def _binary_lsrthn(op):
+    return op._a.__value__() < op._b.__value__()
+    
+def _binary_gtrthn(op):
+    return op._a.__value__() > op._b.__value__()
+    
+def _binary_lsrequ(op):
+    return op._a.__value__() <= op._b.__value__()
+    
+def _binary_gtrequ(op):
+    return op._a.__value__() >= op._b.__value__()
+    
+def _binary_equals(op):
+    return op._a.__value__() == op._b.__value__()
+    
+def _binary_differ(op):
+    return op._a.__value__() != op._b.__value__()
+    
+def _binary_spschr(op):
+    return op._a.__value__()[op._b.__value__()]
+    
+def _binary_lft(op):
+    return op._a.__value__() << op._b.__value__()
+    
+def _binary_rgh(op):
+    return op._a.__value__() >> op._b.__value__()
+    
+# same, with a Literal right operand already unwrapped into op._bv
+def _const_add(op):
+    return 0 + op._a.__value__() + op._bv
+    
+def _const_mul(op):
+    return op._a.__value__() * op._bv
+    
+def _const_sub(op):
+    return op._a.__value__() - op._bv
+    
+def _const_div(op):
+    return op._a.__value__() / op._bv
+    
+def _const_mod(op):
+    return op._a.__value__() % op._bv
+    
+def _const_lsrthn(op):
+    return op._a.__value__() < op._bv
+    
+def _const_gtrthn(op):
+    return op._a.__value__() > op._bv
+    
+def _const_lsrequ(op):
+    return op._a.__value__() <= op._bv
+    
+def _const_gtrequ(op):
+    return op._a.__value__() >= op._bv
+    
+def _const_equals(op):
+    return op._a.__value__() == op._bv
+    
+def _const_differ(op):
+    return op._a.__value__() != op._bv
+    
+def _const_spschr(op):
+    return op._a.__value__()[op._bv]
+    
+def _getvar_key(op):
+    key = op._var_key
+    
+    if key is None:
+        name, sc = op._const_operands
+        key = op._var_key = (_intern_name(sc if sc is not None else (op.scope if op.scope is not None else '')), name)
         
-class FunctionPointer(Expression):
-    def __init__(self, environment, fname, fscope=''):
-        self.environment = environment
-        self.fname = fname
-        self.fscope = fscope
+    return key
+    
+def _getvar_const(op):
+    key = _getvar_key(op)
+    
+    try:
+        return op.environment.variables[key]
         
-    def __value__(self):
-        return self.environment.functions[self.fscope][self.fname]
+    except KeyError:
+        return op._handler(op, op._const_operands) # reports the missing variable
         
-    def __debug_value__(self):
-        return "[pointer {}::{}]".format(self.fscope, self.fname)
+def _nfcall_const(op):
+    func = op._native
+    
+    # resolved on first call, so modules aren't imported just by parsing
+    if func is None:
+        func = op._native = op.environment._native_function(op._const_operands[0], op._const_operands[1])
         
-class NativeFunctionError(BaseException):
-    def __init__(self, msg):
-        self.msg = msg
+    return func(*_nospnul(exvalues(op._const_operands, op._dyn_operands)[2:]))
+    
+def _fncall_const(op):
+    # the function itself is looked up every call, since MKFUNC may replace it
+    return op.environment.functions[op._fn_key].execute(*_nospnul(exvalues(op._const_operands, op._dyn_operands)[2:]))
+    
+def _unary_not(op):
+    return ~op._a.__value__()
+    
+def _unary_lognot(op):
+    return not op._a.__value__()
+    
+def _unary_round(op):
+    return int(op._a.__value__())
+    
+def _unary_tostr(op):
+    return str(op._a.__value__())
+    
+def _nary_add(op):
+    res = 0
+    
+    for e in op._args:
+        res += e.__value__()
         
-    def __str__(self):
-        return self.msg
+    return res
+    
+def _nary_mul(op):
+    res = 1
+    
+    for e in op._args:
+        res *= e.__value__()
         
-class Operation(Expression):
-    def __init__(self, environment, operator, *args, scope=None, function=None):
-        self.environment = environment
-        self.operator = operator
-        self.operands = args
-        self.scope = scope
-        self.function = function
+    return res
+    
+_BINARY_EXECS = {
+    "ADDNUM": _binary_add,
+    "MULNUM": _binary_mul,
+    "SUBNUM": _binary_sub,
+    "DIVNUM": _binary_div,
+    "MODNUM": _binary_mod,
+    "POWNUM": _binary_pow,
+    "ROTNUM": _binary_rot,
+    "LSRTHN": _binary_lsrthn,
+    "GTRTHN": _binary_gtrthn,
+    "LSREQU": _binary_lsrequ,
+    "GTREQU": _binary_gtrequ,
+    "EQUALS": _binary_equals,
+    "DIFFER": _binary_differ,
+    "SPSCHR": _binary_spschr,
+    "LFTNUM": _binary_lft,
+    "RGHNUM": _binary_rgh,
+}
+
+_CONST_EXECS = {
+    "ADDNUM": _const_add,
+    "MULNUM": _const_mul,
+    "SUBNUM": _const_sub,
+    "DIVNUM": _const_div,
+    "MODNUM": _const_mod,
+    "LSRTHN": _const_lsrthn,
+    "GTRTHN": _const_gtrthn,
+    "LSREQU": _const_lsrequ,
+    "GTREQU": _const_gtrequ,
+    "EQUALS": _const_equals,
+    "DIFFER": _const_differ,
+    "SPSCHR": _const_spschr,
+}
+
+_UNARY_EXECS = {
+    "NOTNUM": _unary_not,
+    "LOGNOT": _unary_lognot,
+    "ROUNDN": _unary_round,
+    "VTOSTR": _unary_tostr,
+}
+
+_NARY_EXECS = {
+    "ADDNUM": _nary_add,
+    "MULNUM": _nary_mul,
+}
+
+class SpecialNull(object):
+    pass
+    
+    
+SPNULL = SpecialNull()
+
+# Short strings are mostly variable, scope and function names; interning them
+# makes the dict lookups keyed on them compare by identity.
+_INTERN_MAX = 64
+
+def _intern_name(string):
+    if type(string) is str and len(string) <= _INTERN_MAX:
+        return sys.intern(string)
         
-    def __str__(self):
-        return repr(self)
+    return string
+    
+@contextlib.contextmanager
+def map_file(filename):
+    # Maps bytecode files read-only instead of copying them into memory. The
+    # map is closed when the block ends; decoded values are copies, so only
+    # the readers' own views point into it.
+    with open(filename, 'rb') as fp:
+        if os.fstat(fp.fileno()).st_size == 0:
+            yield b''
+            return
+            
+        mm = mmap.mmap(fp.fileno(), 0, access=mmap.ACCESS_READ)
         
-    def __repr__(self):
-        return "[{} operation with {} operands]".format(self.operator, len(self.operands))
+    try:
+        yield mm
         
-    def __debug_value__(self):
-        return self.operator + '(' + ' '.join(tuple(map(dbgvalue, self.operands))) + ')'
+    except BaseException as e:
+        # the frames in the traceback still hold those views
+        traceback.clear_frames(e.__traceback__)
+        raise
         
-    def __value__(self):
-        # print(self.operator, self.operands)
+    finally:
+        mm.close()
         
-        if self.operator == "REPEAT":
-            res = None            
+def exvalue(expr, *args, **kwargs):
+    return expr.__value__(*args, **kwargs)
         
-            for _ in range(exvalue(self.operands[0])):
-                res = exvalue(self.operands[1])
-                
-            return res
+def dbgvalue(expr):
+    return expr.__debug_value__()
+    
+def split_constants(exprs):
+    # Literals (and instructions, which evaluate to themselves) never change
+    # value, so they are unwrapped once into a template; only the remaining
+    # (index, expression) pairs need to be evaluated every time.
+    template = []
+    dynamic = []
+    
+    for i, e in enumerate(exprs):
+        if type(e) is Literal:
+            template.append(e.value)
             
-        elif self.operator == "IFELSE":
-            if exvalue(self.operands[0]):
-                if type(self.operands[0]) is Instruction:
-                    return self.operands[0].execute()
+        elif type(e) is Instruction:
+            template.append(e)
             
-                return exvalue(self.operands[1])
-                
-            else:
-                if len(self.operands) > 2:
-                    if type(self.operands[0]) is Instruction:
-                        return self.operands[0].execute()
-                      
-                    return exvalue(self.operands[2])
-                        
-                return SPNULL
+        else:
+            template.append(None)
+            dynamic.append((i, e))
             
-        try:
-            operands = tuple(map(exvalue, self.operands))
-            nospnul = tuple(filter(lambda x: x != SPNULL, operands))
-        
-        except BaseException:
-            # print(self.operator, self.operands)
-            raise
-        
-        # print(self.operator, "has operands", operands, "derived from", tuple(map(dbgvalue, self.operands)))420
+    return tuple(template), tuple(dynamic)
     
-        if self.operator == "VTOSTR":
-            return str(operands[0])
+def resolve_labels(instructions):
+    # MLABELs with a constant name are marked once, ahead of execution, and
+    # jumps to a constant label are bound straight to the target position.
+    labels = {}
     
-        if self.operator == "FORALL":
-            f = Function(self.environment, "__FOR__", "__FOR__", *operands[1:])
+    for pos, i in enumerate(instructions):
+        if i.opcode == "MLABEL" and i._is_constant(0):
+            labels[i._label_key(i._const_args[0])] = pos + 1
+            i._run = Instruction._do_marked_label
             
-            def set_function(ioo):
-                if type(ioo) is Operation:
-                    ioo.scope = f.scope or ioo.scope
-                    ioo.function = (ioo.function if ioo.function is not None else f)
-                
-                    for o in ioo.operands:
-                        set_function(o)
-                        
-                elif type(ioo) is Instruction:
-                    ioo.scope = f.scope or ioo.scope
-                    ioo.function = (ioo.function if ioo.function is not None else f)
-                
-                    for o in ioo.arguments:
-                        set_function(o)
+    for i in instructions:
+        if i.opcode in ("JUMPIF", "JUMPIN") and i._is_constant(1):
+            key = i._label_key(i._const_args[1])
+            
+        elif i.opcode == "JUMPLB" and i._is_constant(0) and (len(i.arguments) < 2 or i._is_constant(1)):
+            key = i._label_key(i._const_args[0], (i._const_args[1] if len(i.arguments) > 1 else None))
+            
+        else:
+            continue
+            
+        if key in labels:
+            i._jump = (ST_JUMP, labels[key])
+            i._run = Instruction._RESOLVED_JUMPS[i.opcode]
+            
+    return labels
+    
+# Fused Runs
+# Each position's handler also runs the straight-line instructions after it, up
+# to _FUSE_MAX of them, then steps over them with an offset jump. Every position
+# keeps a handler of its own, so jumps can still land anywhere.
+_FUSE_MAX = 4
+
+def _fused(env, steps, status, watch):
+    # steps holds (handler, instruction) pairs
+    if not watch:
+        def run(_):
+            for h, i in steps:
+                h(i)
                 
-            for o in operands[1:]:
-                set_function(o)
+            return status
+            
+        return run
         
-            res = []
+    def run(_):
+        pos = env.pos
         
-            for item in operands[0]:
-                res.append(f.execute(item))
+        for h, i in steps:
+            h(i)
+            
+            # a function called along the way may GJUMPL; the loop picks the
+            # new position up from env.pos
+            if env.pos != pos:
+                return None
                 
-            return res
-    
-        if self.operator == "GETVAR":
-            sc = operands[1] if operands[1] is not None else (self.scope if self.scope is not None else '')
+        return status
         
-            try:
-                return self.environment.variables[sc][operands[0]]
-                
-            except KeyError:
-                print(operands)
-                print(repr(sc))
-                print(self.environment.variables)
-                raise
+    return run
     
-        if self.operator == "EQUALS":
-            return len(set(operands)) < 2
-            
-        if self.operator == "ISSAME":
-            if len(operands) < 1:
-                return True
+# watch_pos is for the top level, where global jumps land
+def instruction_handlers(instructions, watch_pos=False):
+    handlers = [i._run for i in instructions]
+    fused = list(handlers)
+    run = 0 # straight-line instructions from pos onwards
+    
+    for pos in range(len(instructions) - 1, -1, -1):
+        run = (run + 1 if instructions[pos].opcode not in _STATUS_OPCODES else 0)
+        n = min(run, _FUSE_MAX)
         
-            a = operands[0]
+        if n > 1:
+            steps = tuple(zip(handlers[pos:pos + n], instructions[pos:pos + n]))
+            fused[pos] = _fused(instructions[pos].environment, steps, (ST_OJUMP, n), watch_pos)
             
-            for o in operands[1:]:
-                if o is not a:
-                    return False
-                    
-            return True
-            
-        if self.operator == "DIFFER":
-            return len(set(operands)) > 1
+    return fused
     
-        if self.operator == "GTRTHN":
-            return operands[0] > operands[1]
+def _nospnul(operands):
+    return tuple(filter(lambda x: x != SPNULL, operands))
     
-        if self.operator == "LSRTHN":
-            return operands[0] < operands[1]
+def exvalues(template, dynamic):
+    if not dynamic:
+        return template
+        
+    values = list(template)
     
-        if self.operator == "GTREQU":
-            return operands[0] >= operands[1]
+    for i, e in dynamic:
+        values[i] = e.__value__()
+        
+    return values
+        
+# Constant Folding
+_PURE_OPERATORS = frozenset((
+    "ADDNUM", "SUBNUM", "MULNUM", "DIVNUM", "MODNUM", "POWNUM", "ROTNUM",
+    "ANDNUM", "IORNUM", "XORNUM", "NOTNUM", "LFTNUM", "RGHNUM", "ROUNDN",
+    "LOGAND", "LOGIOR", "LOGXOR", "LOGNOT", "EQUALS", "DIFFER",
+    "GTRTHN", "LSRTHN", "GTREQU", "LSREQU", "MAXNUM", "MINNUM",
+    "CONCAT", "VTOSTR", "SPSCHR",
+))
+
+# only immutable values, so a folded result can't be changed behind its back
+_FOLDABLE_TYPES = (int, float, bool, str, type(None))
+
+def _is_constant_operand(expr):
+    if type(expr) is Literal:
+        return type(expr.value) in _FOLDABLE_TYPES
+        
+    return type(expr) is Operation and expr._foldable
     
-        if self.operator == "PYGITM":
-            return operands[0][operands[1]]
-     
-        if self.operator == "PYHITM":
-            return operands[1] in operands[0]
-            
-        if self.operator == "PYSITM":
-            operands[0][operands[1]] = operands[2]
-            return operands[0]
-            
-        if self.operator == "PYMODL":
-            return importlib.import_module(operands[0])
+def _fold_constant(op):
+    op._folded = op._evaluate()
+    op.__value__ = types.MethodType(_folded_value, op)
+    return op._folded
     
-        if self.operator == "LSREQU":
-            return operands[0] <= operands[1]
+def _folded_value(op):
+    return op._folded
     
-        if self.operator == "CHRONO":
-            return time.time() + (operands[0] if len(operands) > 0 else 0)
+# Subtree Leaves
+# Variable reads and argument reads have no side effects, so a pure tree over
+# them and literals can gather its leaves up front and skip the walk.
+def _is_pure_leaf(e):
+    if type(e) is not Operation:
+        return False
+        
+    if e.operator == "GETVAR":
+        return e._exec is _getvar_const
         
-        if self.operator == "ADDNUM":
-            return sum(operands)
+    return e.operator == "GETARG" and len(e.operands) == 1 and type(e.operands[0]) is Literal and type(e.operands[0].value) is int
+    
+def _leaf_gatherer(leaves):
+    # returns a function reading all the leaves' values at once; the order is
+    # fixed, though not that of the leaves
+    variables = leaves[0].environment.variables if leaves else None
+    keyed = tuple(e for e in leaves if e.operator == "GETVAR")
+    indexed = tuple((e, e.operands[0].value) for e in leaves if e.operator != "GETVAR")
+    
+    # a key dropped by a scope change fails the lookup, and the fallback
+    # evaluation builds it again
+    def gather():
+        values = [variables[e._var_key] for e in keyed]
+        
+        for e, index in indexed:
+            f = e.function
+            values.append(f._args[index] if f is not None and len(f._args) > index else SPNULL)
             
-        if self.operator == "MAXNUM":
-            return max(operands)
+        return tuple(values)
+        
+    return gather
+    
+# Memoized Subtrees
+# Large pure trees remember their results for the leaf values they were
+# evaluated with, in a bounded table of their own.
+_MEMO_MIN_SIZE = 8
+_MEMO_MAX = 256 # entries per tree
+_MEMO_GIVEUP = 256 # a tree that misses more than it hits over this many misses drops its memo
+
+# floats are left out: -0.0 == 0.0, yet VTOSTR tells them apart
+_MEMO_KEY_TYPES = frozenset((int, bool, str, type(None)))
+_MEMO_RESULT_TYPES = frozenset(_FOLDABLE_TYPES)
+
+def _memo_size(operator, args):
+    if operator not in _PURE_OPERATORS:
+        return 0
+        
+    size = 1
+    
+    for e in args:
+        if type(e) is Operation and e._memo_size > 0:
+            size += e._memo_size
             
-        if self.operator == "MINNUM":
-            return min(operands)
+        elif not (_is_constant_operand(e) or _is_pure_leaf(e)):
+            return 0
             
-        if self.operator == "EXECUT":
-            for i in operands:
-                if type(i) is Instruction:
-                    i.execute()
-                    
-                else:
-                    raise RuntimeError("EXECUT: {} is not an instruction!".format(dbgvalue(i)))
+    return size
+    
+def _memo_leaves(e, leaves):
+    if type(e) is Operation and e._memo_size > 0:
+        for o in e.operands:
+            _memo_leaves(o, leaves)
+            
+    elif not _is_constant_operand(e):
+        leaves.append(e)
         
-            return None
+    return leaves
+    
+def _memo_evaluator(op):
+    gather = _leaf_gatherer(_memo_leaves(op, []))
+    evaluate = op._evaluate
+    table = op._memo_table = {} # (leaf values, leaf types) -> result
+    op._memo_hits = op._memo_misses = 0
+    
+    def run():
+        try:
+            values = gather()
+            
+        except KeyError:
+            return evaluate()
             
-        if self.operator == "IFORNL":
-            if operands[0]:
-                if type(operands[1]) is Instruction:
-                    return operands[1].execute()
+        kinds = tuple(map(type, values))
+        
+        # the types are part of the key, since True == 1
+        if _MEMO_KEY_TYPES.issuperset(kinds):
+            key = values + kinds
+            
+            try:
+                res = table[key]
+                op._memo_hits += 1
+                return res
                 
-                else:
-                    return operands[1]
+            except KeyError:
+                pass
                 
-            else:
-                return None
+            res = evaluate()
             
-        if self.operator == "SUBNUM":
-            return operands[0] - operands[1]
+            if type(res) in _MEMO_RESULT_TYPES:
+                if len(table) >= _MEMO_MAX:
+                    del table[next(iter(table))]
+                    
+                table[key] = res
+                
+        else:
+            res = evaluate()
             
-        if self.operator == "MULNUM":
-            return reduce(lambda a, b: a * b, operands, 1)
+        op._memo_misses += 1
+        
+        if op._memo_misses >= _MEMO_GIVEUP:
+            if op._memo_hits < op._memo_misses:
+                op.__value__ = evaluate
+                table.clear()
+                
+            op._memo_hits = op._memo_misses = 0
             
-        if self.operator == "DIVNUM":
-            return operands[0] / operands[1]
+        return res
+        
+    return run
+    
+# Evaluators
+# An Operation's __value__ is picked once, when it is built:
+# - specialized nodes evaluate straight into their handler, so a tree walk
+#   costs one call per node
+# - pure operations on constants are evaluated once, on first use (so errors
+#   still happen at run time), and the tree is kept for dumping
+# - large pure trees answer from their memo
+def _evaluator(op):
+    evaluate = types.MethodType(op._exec if op._exec is not None else Operation.__value__, op)
+    
+    if op._foldable:
+        op._evaluate = evaluate
+        return types.MethodType(_fold_constant, op)
+        
+    if op._memo_size >= _MEMO_MIN_SIZE:
+        op._evaluate = evaluate
+        return _memo_evaluator(op)
+        
+    return evaluate
+    
+# Function Compiler
+_JIT_BINARY = {
+    "SUBNUM": "({} - {})",
+    "DIVNUM": "({} / {})",
+    "MODNUM": "({} % {})",
+    "POWNUM": "math.pow({}, {})",
+    "LSRTHN": "({} < {})",
+    "GTRTHN": "({} > {})",
+    "LSREQU": "({} <= {})",
+    "GTREQU": "({} >= {})",
+    "LFTNUM": "({} << {})",
+    "RGHNUM": "({} >> {})",
+    "EQUALS": "({} == {})",
+    "DIFFER": "({} != {})",
+    "SPSCHR": "{}[{}]",
+}
+
+_JIT_UNARY = {
+    "NOTNUM": "(~{})",
+    "LOGNOT": "(not {})",
+    "ROUNDN": "int({})",
+    "VTOSTR": "str({})",
+}
+
+# (start, separator), so two or more operands reduce like _nary_add and _nary_mul
+_JIT_NARY = {
+    "ADDNUM": ("0", " + "),
+    "MULNUM": ("1", " * "),
+}
+
+class _FunctionCompiler(object):
+    def __init__(self, function):
+        self.function = function
+        self.names = {"math": math, "SPNULL": SPNULL, "_nospnul": _nospnul, "V": function.environment.variables, "F": function.environment.functions}
+        self.lines = []
+        
+    def bind(self, value):
+        name = "c{}".format(len(self.names))
+        self.names[name] = value
+        return name
+        
+    def constant(self, expr, index):
+        if index < len(expr.operands) and type(expr.operands[index]) is Literal:
+            return expr.operands[index].value
+            
+        return SPNULL
+        
+    def expression(self, expr):
+        # anything that isn't recognized is evaluated by the node itself
+        if type(expr) is Literal:
+            return self.bind(expr.value)
             
-        if self.operator == "MODNUM":
-            return operands[0] % operands[1]
+        if type(expr) is not Operation:
+            return "{}.__value__()".format(self.bind(expr))
             
-        if self.operator == "POWNUM":
-            return math.pow(operands[0], operands[1])
+        op = expr.operator
+        ops = expr.operands
+        
+        if len(ops) == 2 and op in _JIT_BINARY:
+            return _JIT_BINARY[op].format(self.expression(ops[0]), self.expression(ops[1]))
             
-        if self.operator == "ROTNUM":
-            return math.pow(operands[0], 1.0 / operands[1])
+        if len(ops) == 1 and op in _JIT_UNARY:
+            return _JIT_UNARY[op].format(self.expression(ops[0]))
             
-        if self.operator == "ANDNUM":
-            return reduce(lambda a, b: a & b, operands)
+        if len(ops) > 1 and op in _JIT_NARY:
+            start, sep = _JIT_NARY[op]
+            return "(" + sep.join((start,) + tuple(map(self.expression, ops))) + ")"
             
-        if self.operator == "IORNUM":
-            return reduce(lambda a, b: a | b, operands)
+        if op == "GETVAR" and expr._exec is _getvar_const:
+            # the key follows the node's scope, and a missing variable is
+            # left to the node so it's reported like in the interpreter
+            return "(V[{0}._var_key] if {0}._var_key in V else {0}.__value__())".format(self.bind(expr))
             
-        if self.operator == "XORNUM":
-            return reduce(lambda a, b: a ^ b, operands)
+        if op == "GETARG" and len(ops) == 1 and type(ops[0]) is Literal and type(ops[0].value) is int and expr.function is self.function:
+            # the arguments are read from the function each time, like GETARG does
+            return "(fn._args[{0}] if len(fn._args) > {0} else SPNULL)".format(ops[0].value)
             
-        if self.operator == "NOTNUM":
-            return ~operands[0]
+        if op == "FNCALL" and len(ops) >= 2 and type(ops[0]) is Literal and type(ops[1]) is Literal:
+            key = (ops[1].value if ops[1].value is not None else '', ops[0].value)
+            return "F[{}].execute(*_nospnul(({})))".format(self.bind(key), "".join(self.expression(o) + ", " for o in ops[2:]))
             
-        if self.operator == "LFTNUM":
-            return operands[0] << operands[1]
+        return "{}.__value__()".format(self.bind(expr))
+        
+    def instruction(self, i):
+        arguments = i.arguments
+        const = all(type(a) is Literal for a in arguments[:1] + arguments[2:3])
+        
+        if i.opcode in _FLOW_OPCODES or i.opcode == "JUMPTO":
+            return False
             
-        if self.operator == "RGHNUM":
-            return operands[0] >> operands[1]
+        if i._run is Instruction._do_setvar_const:
+            self.lines.append("V[{}._setvar_key()] = {}".format(self.bind(i), self.expression(arguments[1])))
             
-        if self.operator == "ROUNDN":
-            return int(operands[0])
+        elif i.opcode == "GSTVAR" and len(arguments) >= 2 and const:
+            self.lines.append("V[{}] = {}".format(self.bind(("", arguments[0].value)), self.expression(arguments[1])))
             
-        if self.operator == "LOGAND":
-            return reduce(lambda a, b: a and b, operands)
+        elif i.opcode == "RETURN" and len(arguments) >= 1 and i.function is self.function:
+            self.lines.append("res = {}".format(self.expression(arguments[0])))
             
-        if self.operator == "LOGIOR":
-            return reduce(lambda a, b: a or b, operands)
+        elif i.opcode == "TERMIN":
+            self.lines.append("return res")
             
-        if self.operator == "LOGXOR":
-            return reduce(lambda a, b: bool(a) != bool(b), operands)
+        elif i.opcode == "NULLEV":
+            self.lines.extend(map(self.expression, arguments))
             
-        if self.operator == "LOGNOT":
-            return not operands[0]
+        else:
+            # other instructions can't change the control flow
+            self.lines.append("{}({})".format(self.bind(i._run), self.bind(i)))
             
-        if self.operator == "SSLICE":
-            return operands[0][operands[1]: operands[2]]
+        return True
+        
+    def compile(self):
+        for i in self.function.instructions:
+            if not self.instruction(i):
+                return None
+                
+        source = "def compiled(fn):\n    res = None\n" + "".join("    {}\n".format(l) for l in self.lines) + "    return res\n"
+        exec(compile(source, "<netbyte function {}::{}>".format(self.function.scope, self.function.name), "exec"), self.names)
+        return self.names["compiled"]
+        
+# Compiles a function's body into a Python function that takes the Function
+# and returns its result, or returns None if the body has jumps or labels.
+# Variables, functions and unrecognized expressions are still read from the
+# environment and the nodes themselves, so it behaves like Function.execute.
+def compile_function(function):
+    return _FunctionCompiler(function).compile()
+    
+class Expression(object):
+    __slots__ = () # so that Literal's slots hold
+    
+    def __value__(self):
+        raise RuntimeError("Expression objects can't be used directly!")
+        
+class FunctionPointer(Expression):
+    def __init__(self, environment, fname, fscope=''):
+        self.environment = environment
+        self.fname = fname
+        self.fscope = fscope
+        
+    def __value__(self):
+        return self.environment.functions[(self.fscope, self.fname)]
+        
+    def __debug_value__(self):
+        return "[pointer {}::{}]".format(self.fscope, self.fname)
+        
+class NativeFunctionError(BaseException):
+    def __init__(self, msg):
+        self.msg = msg
+        
+    def __str__(self):
+        return self.msg
+        
+class Operation(Expression):
+    def __init__(self, environment, operator, *args, scope=None, function=None):
+        self.environment = environment
+        
+        # the bytecode reader passes the operator's index itself
+        if type(operator) is int:
+            self.op_id = operator
+            operator = EXPR_OPCODES[operator]
             
-        if self.operator == "CONCAT":
-            return reduce(lambda a, b: "{}{}".format(str(a), str(b)), operands, '')
+        else:
+            self.op_id = _EXPR_ID.get(operator)
             
-        if self.operator == "MKFNCP":
-            sc = (operands[1] if len(operands) > 1 and operands[1] is not None else (self.scope if self.scope is not None else ''))
-            return FunctionPointer(self, operands[0], sc)
+        if self.op_id is not None:
+            self._handler = Operation._OP_HANDLERS[self.op_id]
             
-        if self.operator == "MKFNCL":
-            name = operands[0]
-            scope = (operands[1] if len(operands) > 1 and operands[1] is not None else (self.scope if self.scope is not None else ''))
-            body = operands[2:]
+        else:
+            self._handler = Operation._op_unknown
+        
+        self.operator = operator
+        self.operands = args
+        self._scope = scope
+        self._var_key = None
+        self.function = function
+        self._const_operands, self._dyn_operands = split_constants(args)
+        self._fast = _FAST_OPS.get(operator)
+        
+        self._exec = Operation._LAZY_HANDLERS.get(operator)
+        
+        if len(args) == 2 and operator in _BINARY_EXECS:
+            self._a, self._b = args
+            self._exec = _BINARY_EXECS[operator]
             
-            f = Function(self.environment, scope, name, *body)
+            if type(self._b) is Literal and operator in _CONST_EXECS:
+                self._bv = self._b.value
+                self._exec = _CONST_EXECS[operator]
             
-            def set_function(ioo):
-                if type(ioo) is Operation:
-                    ioo.scope = f.scope or ioo.scope
-                    ioo.function = (ioo.function if ioo.function is not None else f)
-                
-                    for o in ioo.operands:
-                        set_function(o)
-                        
-                elif type(ioo) is Instruction:
-                    ioo.scope = f.scope or ioo.scope
-                    ioo.function = (ioo.function if ioo.function is not None else f)
-                
-                    for o in ioo.arguments:
-                        set_function(o)
-                
-            for i in body:
-                set_function(i)
+        elif len(args) == 1 and operator in _UNARY_EXECS:
+            self._a, = args
+            self._exec = _UNARY_EXECS[operator]
             
-            return f
+        elif operator in _NARY_EXECS:
+            self._args = args
+            self._exec = _NARY_EXECS[operator]
             
-        if self.operator == "SPSCHR":
-            return operands[0][operands[1]]
+        if operator == "GETVAR" and len(args) == 2 and type(args[0]) is Literal and type(args[1]) is Literal:
+            self._exec = _getvar_const
             
-        if self.operator == "FNCALL":
-            return self.environment.functions[operands[1] if operands[1] is not None else ''][operands[0]].execute(*nospnul[2:])
+        elif operator == "NFCALL" and len(args) >= 2 and type(args[0]) is Literal and type(args[1]) is Literal:
+            self._native = None
+            self._exec = _nfcall_const
             
-        if self.operator == "FPCALL":
-            return operands[0].execute(*nospnul[1:])
+        elif operator == "FNCALL" and len(args) >= 2 and type(args[0]) is Literal and type(args[1]) is Literal:
+            self._fn_key = (_intern_name(args[1].value if args[1].value is not None else ''), args[0].value)
+            self._exec = _fncall_const
             
-        if self.operator == "FNCARG":
-            return self.environment.functions[operands[1] if operands[1] is not None else ''][operands[0]].execute(*nospnul[2])
+        self._foldable = operator in _PURE_OPERATORS and all(_is_constant_operand(e) for e in args)
+        self._memo_size = (_memo_size(operator, args) if not self._foldable else 0)
+        self.__value__ = _evaluator(self)
+        
+    @property
+    def scope(self):
+        return self._scope
+        
+    @scope.setter
+    def scope(self, scope):
+        # FORALL and MKFNCL reassign the same scope on every evaluation
+        if scope != self._scope:
+            self._scope = scope
+            self._var_key = None
+        
+    def __str__(self):
+        return repr(self)
+        
+    def __repr__(self):
+        return "[{} operation with {} operands]".format(self.operator, len(self.operands))
+        
+    def __debug_value__(self):
+        return self.operator + '(' + ' '.join(tuple(map(dbgvalue, self.operands))) + ')'
+        
+    def __value__(self):
+        operands = exvalues(self._const_operands, self._dyn_operands)
+        
+        if self._fast is not None:
+            return self._fast(operands)
             
-        if self.operator == "FPCARG":
-            return operands[0].execute(*nospnul[1])
+        return self._handler(self, operands)
+        
+    # REPEAT and IFELSE evaluate their operands lazily
+    def _op_repeat(self):
+        count = self.operands[0].__value__()
+        body = self.operands[1]
+        
+        if type(body) is Literal:
+            return body.value if count > 0 else None
             
-        if self.operator == "GETARG":
-            if self.function is None:
-                return SPNULL
-                
-            elif operands[0] == None:
-                return self.function._args
-                
-            elif len(self.function._args) <= operands[0]:
-                return SPNULL
+        body_value = body.__value__
+        res = None
+    
+        for _ in range(count):
+            res = body_value()
             
-            else:
-                return self.function._args[operands[0]]
+        return res
+        
+    def _op_ifelse(self):
+        if self.operands[0].__value__():
+            if type(self.operands[0]) is Instruction:
+                return self.operands[0].execute()
+        
+            return self.operands[1].__value__()
             
-        if self.operator == "NFCALL":
-            if len(operands) < 2 or operands[1] is None:
-                if operands[0] in globals():
-                    return globals()[operands[0]](*nospnul[2:])
-                    
-                elif operands[0] in __builtins__:
-                    return __builtins__[operands[0]](*nospnul[2:])
+        else:
+            if len(self.operands) > 2:
+                if type(self.operands[0]) is Instruction:
+                    return self.operands[0].execute()
+                  
+                return self.operands[2].__value__()
                     
-                else:
-                    raise NativeFunctionError("ERROR:NativeFunctionError:Native function not found in builtins nor globals: '{}'".format(operands[0]))
+            return SPNULL
         
-            else:
-                mod = importlib.import_module(operands[1])
+    def _op_forall(self, operands):
+        f = Function(self.environment, "__FOR__", "__FOR__", *operands[1:])
+        
+        def set_function(ioo):
+            if type(ioo) is Operation:
+                ioo.scope = f.scope or ioo.scope
+                ioo.function = (ioo.function if ioo.function is not None else f)
             
-                if hasattr(mod, operands[0]):
-                    return getattr(mod, operands[0])(*nospnul[2:])
+                for o in ioo.operands:
+                    set_function(o)
                     
-                else:
-                    raise NativeFunctionError("Native function not found in '{}' module: '{}'".format(operands[1], operands[0]))
+            elif type(ioo) is Instruction:
+                ioo.scope = f.scope or ioo.scope
+                ioo.function = (ioo.function if ioo.function is not None else f)
+            
+                for o in ioo.arguments:
+                    set_function(o)
+            
+        for o in operands[1:]:
+            set_function(o)
+    
+        res = []
+    
+        for item in operands[0]:
+            res.append(f.execute(item))
+            
+        return res
         
-        if self.operator == "NFCARG":
-            if operands[1] is None or len(operands) < 2:
-                if operands[0] in globals():
-                    return globals()[operands[0]](*operands[2])
-                    
-                elif operands[0] in __builtins__:
-                    return __builtins__[operands[0]](*operands[2])
+    def _op_mkfncp(self, operands):
+        sc = (operands[1] if len(operands) > 1 and operands[1] is not None else (self.scope if self.scope is not None else ''))
+        return FunctionPointer(self, operands[0], sc)
+        
+    def _op_mkfncl(self, operands):
+        name = operands[0]
+        scope = (operands[1] if len(operands) > 1 and operands[1] is not None else (self.scope if self.scope is not None else ''))
+        body = operands[2:]
+        
+        f = Function(self.environment, scope, name, *body)
+        
+        def set_function(ioo):
+            if type(ioo) is Operation:
+                ioo.scope = f.scope or ioo.scope
+                ioo.function = (ioo.function if ioo.function is not None else f)
+            
+                for o in ioo.operands:
+                    set_function(o)
                     
-                else:
-                    raise NativeFunctionError("ERROR:NativeFunctionError:Native function not found in builtins nor globals: '{}'".format(operands[0]))
+            elif type(ioo) is Instruction:
+                ioo.scope = f.scope or ioo.scope
+                ioo.function = (ioo.function if ioo.function is not None else f)
+            
+                for o in ioo.arguments:
+                    set_function(o)
+            
+        for i in body:
+            set_function(i)
+        
+        return f
+        
+    def _op_getvar(self, operands):
+        sc = operands[1] if operands[1] is not None else (self.scope if self.scope is not None else '')
+    
+        try:
+            return self.environment.variables[(sc, operands[0])]
+            
+        except KeyError:
+            raise KeyError("GETVAR: no such variable '{}' in scope '{}'!".format(operands[0], sc))
+        
+    def _op_vtostr(self, operands):
+        return str(operands[0])
+        
+    def _op_getarg(self, operands):
+        if self.function is None:
+            return SPNULL
+            
+        elif operands[0] == None:
+            return self.function._args
+            
+        elif len(self.function._args) <= operands[0]:
+            return SPNULL
+        
+        else:
+            return self.function._args[operands[0]]
+        
+    def _op_fncall(self, operands):
+        nospnul = _nospnul(operands)
+        
+        return self.environment.functions[(operands[1] if operands[1] is not None else '', operands[0])].execute(*nospnul[2:])
         
+    def _op_fpcall(self, operands):
+        nospnul = _nospnul(operands)
+        
+        return operands[0].execute(*nospnul[1:])
+        
+    def _op_ifornl(self, operands):
+        if operands[0]:
+            if type(operands[1]) is Instruction:
+                return operands[1].execute()
+            
             else:
-                mod = importlib.import_module(operands[1])
+                return operands[1]
             
-                if hasattr(mod, operands[0]):
-                    return getattr(mod, operands[0])(*nospnul[2])
-                    
-                else:
-                    raise NativeFunctionError("Native function not found in '{}' module: '{}'".format(operands[1], operands[0]))
+        else:
+            return None
         
-        if self.operator == "NPCALL":
-            return operands[0](*nospnul[1:])
+    def _op_nfcall(self, operands):
+        nospnul = _nospnul(operands)
+        return self.environment._native_function(operands[0], (operands[1] if len(operands) > 1 else None))(*nospnul[2:])
         
-        if self.operator == "NPCARG":
-            return operands[0](*nospnul[1])
+    def _op_npcall(self, operands):
+        nospnul = _nospnul(operands)
         
-        if self.operator == "PYATTR":
-            if hasattr(operands[1], operands[0]):
-                return getattr(operands[1], operands[0], (operands[2] if len(operands) > 2 else None))
+        return operands[0](*nospnul[1:])
+        
+    def _op_chrono(self, operands):
+        return time.time() + (operands[0] if len(operands) > 0 else 0)
+        
+    def _op_execut(self, operands):
+        for i in operands:
+            if type(i) is Instruction:
+                i.execute()
                 
             else:
-                raise RuntimeError("PYATTR: no such attribute '{}' in {}!".format(operands[0], repr(operands[1])))
+                raise RuntimeError("EXECUT: {} is not an instruction!".format(dbgvalue(i)))
+    
+        return None
+        
+    def _op_pyattr(self, operands):
+        if hasattr(operands[1], operands[0]):
+            return getattr(operands[1], operands[0], (operands[2] if len(operands) > 2 else None))
+            
+        else:
+            raise RuntimeError("PYATTR: no such attribute '{}' in {}!".format(operands[0], repr(operands[1])))
+        
+    def _op_pygitm(self, operands):
+        return operands[0][operands[1]]
+        
+    def _op_pyhitm(self, operands):
+        return operands[1] in operands[0]
+        
+    def _op_pysitm(self, operands):
+        operands[0][operands[1]] = operands[2]
+        return operands[0]
+        
+    def _op_pymodl(self, operands):
+        return importlib.import_module(operands[0])
+        
+    def _op_fncarg(self, operands):
+        nospnul = _nospnul(operands)
+        
+        return self.environment.functions[(operands[1] if operands[1] is not None else '', operands[0])].execute(*nospnul[2])
+        
+    def _op_nfcarg(self, operands):
+        if len(operands) < 2 or operands[1] is None:
+            return self.environment._native_function(operands[0])(*operands[2])
+    
+        return self.environment._native_function(operands[0], operands[1])(*_nospnul(operands)[2])
+        
+    def _op_fpcarg(self, operands):
+        nospnul = _nospnul(operands)
+        
+        return operands[0].execute(*nospnul[1])
+        
+    def _op_npcarg(self, operands):
+        nospnul = _nospnul(operands)
+        
+        return operands[0](*nospnul[1])
+        
+    def _op_issame(self, operands):
+        if len(operands) < 1:
+            return True
+    
+        a = operands[0]
+        
+        for o in operands[1:]:
+            if o is not a:
+                return False
+                
+        return True
+        
+    def _op_gtrthn(self, operands):
+        return operands[0] > operands[1]
+        
+    def _op_lsrthn(self, operands):
+        return operands[0] < operands[1]
+        
+    def _op_gtrequ(self, operands):
+        return operands[0] >= operands[1]
+        
+    def _op_lsrequ(self, operands):
+        return operands[0] <= operands[1]
+        
+    def _op_logand(self, operands):
+        res = operands[0]
+        
+        for v in operands[1:]:
+            if not res:
+                break
+                
+            res = v
+            
+        return res
+        
+    def _op_logior(self, operands):
+        res = operands[0]
+        
+        for v in operands[1:]:
+            if res:
+                break
+                
+            res = v
+            
+        return res
+        
+    def _op_logxor(self, operands):
+        res = operands[0]
+        
+        for v in operands[1:]:
+            res = bool(res) != bool(v)
+            
+        return res
+        
+    def _op_lognot(self, operands):
+        return not operands[0]
+        
+    def _op_maxnum(self, operands):
+        return max(operands)
+        
+    def _op_minnum(self, operands):
+        return min(operands)
+        
+    def _op_subnum(self, operands):
+        return operands[0] - operands[1]
+        
+    def _op_divnum(self, operands):
+        return operands[0] / operands[1]
+        
+    def _op_modnum(self, operands):
+        return operands[0] % operands[1]
+        
+    def _op_pownum(self, operands):
+        return math.pow(operands[0], operands[1])
+        
+    def _op_rotnum(self, operands):
+        return math.pow(operands[0], 1.0 / operands[1])
+        
+    def _op_notnum(self, operands):
+        return ~operands[0]
+        
+    def _op_lftnum(self, operands):
+        return operands[0] << operands[1]
+        
+    def _op_rghnum(self, operands):
+        return operands[0] >> operands[1]
+        
+    def _op_roundn(self, operands):
+        return int(operands[0])
+        
+    def _op_sslice(self, operands):
+        return operands[0][operands[1]: operands[2]]
+        
+    def _op_concat(self, operands):
+        return ''.join(map(str, operands))
+        
+    def _op_spschr(self, operands):
+        return operands[0][operands[1]]
+        
+    def _op_unknown(self, operands):
+        return None
+        
+    _LAZY_HANDLERS = {
+        "REPEAT": _op_repeat,
+        "IFELSE": _op_ifelse,
+    }
+    
+    _HANDLERS = {
+        "FORALL": _op_forall,
+        "MKFNCP": _op_mkfncp,
+        "MKFNCL": _op_mkfncl,
+        "GETVAR": _op_getvar,
+        "VTOSTR": _op_vtostr,
+        "GETARG": _op_getarg,
+        "FNCALL": _op_fncall,
+        "FPCALL": _op_fpcall,
+        "IFORNL": _op_ifornl,
+        "NFCALL": _op_nfcall,
+        "NPCALL": _op_npcall,
+        "CHRONO": _op_chrono,
+        "EXECUT": _op_execut,
+        "PYATTR": _op_pyattr,
+        "PYGITM": _op_pygitm,
+        "PYHITM": _op_pyhitm,
+        "PYSITM": _op_pysitm,
+        "PYMODL": _op_pymodl,
+        "FNCARG": _op_fncarg,
+        "NFCARG": _op_nfcarg,
+        "FPCARG": _op_fpcarg,
+        "NPCARG": _op_npcarg,
+        "ISSAME": _op_issame,
+        "GTRTHN": _op_gtrthn,
+        "LSRTHN": _op_lsrthn,
+        "GTREQU": _op_gtrequ,
+        "LSREQU": _op_lsrequ,
+        "LOGAND": _op_logand,
+        "LOGIOR": _op_logior,
+        "LOGXOR": _op_logxor,
+        "LOGNOT": _op_lognot,
+        "MAXNUM": _op_maxnum,
+        "MINNUM": _op_minnum,
+        "SUBNUM": _op_subnum,
+        "DIVNUM": _op_divnum,
+        "MODNUM": _op_modnum,
+        "POWNUM": _op_pownum,
+        "ROTNUM": _op_rotnum,
+        "NOTNUM": _op_notnum,
+        "LFTNUM": _op_lftnum,
+        "RGHNUM": _op_rghnum,
+        "ROUNDN": _op_roundn,
+        "SSLICE": _op_sslice,
+        "CONCAT": _op_concat,
+        "SPSCHR": _op_spschr,
+    }
+    
+    # indexed by the operator byte (minus one); lazy and fast operators have no entry
+    _OP_HANDLERS = tuple(map(_HANDLERS.get, EXPR_OPCODES, (_op_unknown,) * len(EXPR_OPCODES)))
         
 class Literal(Expression):
+    __slots__ = ("environment", "value")
+    
     def __init__(self, environment, value):
         self.environment = environment
         self.value = value
@@ -515,9 +1331,17 @@ class Function(object):
         self.scope = scope
         self.name = name
         self.instructions = instructions
+        self._labels = None
+        self._handlers = None
+        self._calls = 0
+        self._compiled = None
+        self._hash = hash((scope, name))
         
     def __hash__(self):
-        return hash(self.scope.replace(':', '_') + "::" + self.name.replace(':', '_'))
+        return self._hash
+        
+    def __eq__(self, other):
+        return type(other) is Function and (self.scope, self.name) == (other.scope, other.name)
         
     def __str__(self):
         return repr(self)
@@ -526,60 +1350,115 @@ class Function(object):
         return "[Function with {} instructions]".format(len(self.instructions))
         
     def execute(self, *args):
-        res = None
-        labels = self.environment._labels
-        pos = 0
         self._args = args
         
-        # Static Labels
-        for i in self.instructions:
-            if i.opcode == "MLABEL":
-                status = i.execute()
-                
-                if status[:6] == "LABEL:":
-                    labels[status[6:]] = pos + 1
+        if self._compiled is not None:
+            return self._compiled(self)
             
-            pos += 1
+        self._calls += 1
+        
+        if self._calls == self.environment.JIT_THRESHOLD:
+            self._compiled = compile_function(self)
             
+            if self._compiled is not None:
+                return self._compiled(self)
+        
+        res = None
         pos = 0
         
-        while pos < len(self.instructions):
-            i = self.instructions[pos]
-            status = i.execute()
+        if self._labels is None:
+            self._labels = resolve_labels(self.instructions)
+            self._handlers = instruction_handlers(self.instructions)
             
-            if status is not None:
-                if status == "SETRES":
-                    res = self.environment.return_stack[self]
-                    self.environment.return_stack[self] = None
-                    
-                elif status == "TERMINATE":
-                    break
-                    
-                elif status[:5] == "JUMP:":
-                    pos = int(status[5:])
-                    
-                elif status[:6] == "OJUMP:":
-                    pos += int(status[5:])
-                    
-                elif status[:6] == "LJUMP:":
-                    pos = labels[status[6:]]
-                    
-                # Dynamic Labels
-                elif status[:6] == "LABEL:":
-                    labels[status[6:]] = pos + 1
-                
-            if status is None or (status[:5] != "JUMP:" and status[:6] != "LJUMP:" and status[:6] != "OJUMP:"):
+        labels = self._labels
+        handlers = self._handlers
+        instructions = self.instructions
+        count = len(instructions)
+        
+        while pos < count:
+            status = handlers[pos](instructions[pos])
+            
+            if status is None:
                 pos += 1
+                continue
+                
+            code = status[0]
+            
+            if code == ST_JUMP:
+                pos = status[1]
+                continue
+                
+            elif code == ST_LJUMP:
+                pos = labels[status[1]]
+                continue
+                
+            elif code == ST_OJUMP:
+                pos += status[1]
+                continue
+                
+            elif code == ST_SETRES:
+                returns = self.environment.return_stack
+                res = returns[id(self)]
+                returns[id(self)] = None
+                
+            elif code == ST_TERMINATE:
+                break
+                
+            # Dynamic Labels
+            elif code == ST_LABEL:
+                labels[status[1]] = pos + 1
+                
+            pos += 1
                 
         return res
         
 class Instruction(object):
+    # _jump is only set on jumps whose target is known ahead of time
+    __slots__ = (
+        "environment", "_scope", "_var_key", "arguments", "function", "opcode", "opcode_id",
+        "_const_args", "_dyn_args", "_argbuf", "_evaluating", "_run", "_jump",
+    )
+    
     def __init__(self, environment, scope, opcode, *args, function=None):
         self.environment = environment
-        self.scope = scope
-        self.opcode = opcode
+        self._scope = scope
+        self._var_key = None
         self.arguments = args
         self.function = function
+        self._const_args, self._dyn_args = split_constants(args)
+        self._argbuf = list(self._const_args)
+        self._evaluating = False
+        
+        # the bytecode reader passes the opcode byte itself
+        if type(opcode) is int:
+            self.opcode_id = opcode
+            self.opcode = BASE_OPCODES[opcode]
+            self._run = Instruction._OP_HANDLERS[opcode]
+            
+        else:
+            self.opcode_id = _BASE_ID.get(opcode)
+            self.opcode = opcode
+            self._run = Instruction._HANDLERS.get(opcode, Instruction._do_nullev)
+            
+        # constant variable names get their (scope, name) key built once per scope
+        if self.opcode == "SETVAR" and len(args) >= 2 and self._is_constant(0) and (len(args) < 3 or self._is_constant(2)):
+            self._run = Instruction._do_setvar_const
+            
+        # constant jump targets don't depend on scope, so the status is built once
+        if self.opcode in Instruction._OFFSET_JUMPS and self._is_constant(0):
+            self._jump = (Instruction._OFFSET_JUMPS[self.opcode], self._const_args[0])
+            self._run = Instruction._do_cached_jump
+        
+    @property
+    def scope(self):
+        return self._scope
+        
+    @scope.setter
+    def scope(self, scope):
+        # MKFUNC moves instructions into the function's scope after parsing
+        if scope != self._scope:
+            self._scope = scope
+            self._var_key = None
         
     def __str__(self):
         return repr(self)
@@ -591,124 +1470,230 @@ class Instruction(object):
         return self.opcode + '(' + ' '.join(tuple(map(dbgvalue, self.arguments))) + ')'
         
     def execute(self):
-        arguments = tuple(map(exvalue, self.arguments))
-        nospnul = tuple(filter(lambda x: x != SPNULL, arguments))
-
-        # print(self.opcode, "has arguments", arguments, "derived from", tuple(map(dbgvalue, self.arguments)))
-    
-        if self.opcode == 'SETVAR':
-            sc = "::".join(tuple(filter(lambda x: x is not None, ((self.scope if self.scope is not None else None), (arguments[2] if len(arguments) > 2 else None)))))
+        return self._run(self)
         
-            if sc not in self.environment.variables:
-                self.environment.variables[sc] = {}
+    def _eval_args(self):
+        if not self._dyn_args:
+            return self._const_args
             
-            self.environment.variables[sc][arguments[0]] = arguments[1]
+        # An argument may call back into this very instruction (e.g. a
+        # recursive FNCALL); the shared buffer is still being filled then.
+        if self._evaluating:
+            return exvalues(self._const_args, self._dyn_args)
             
-        if self.opcode == 'GSTVAR':
-            sc = ""
+        buf = self._argbuf
+        self._evaluating = True
         
-            if sc not in self.environment.variables:
-                self.environment.variables[sc] = {}
-        
-            self.environment.variables[sc][arguments[0]] = arguments[1]
-            
-        elif self.opcode == 'DELVAR':
-            if self.scope in self.environment.variables and arguments[0] in self.environment.variables[self.scope]:
-                self.environment.variables[self.scope].pop(arguments[0])
+        try:
+            for i, e in self._dyn_args:
+                buf[i] = e.__value__()
                 
-        elif self.opcode == 'MKFUNC':
-            name = arguments[0]
-            scope = (self.scope + ":" if self.scope is not None else "") + (arguments[1] if arguments[1] is not None else "")
-            instructions = arguments[2:]
+        finally:
+            self._evaluating = False
             
-            if scope is not None:
-                for i in instructions:
-                    i.scope = scope
+        return buf
+        
+    def _is_constant(self, index):
+        return index < len(self.arguments) and index not in dict(self._dyn_args)
+        
+    def _label_key(self, name, scope=None):
+        if scope is None:
+            scope = (self.scope if self.scope is not None else '')
             
-            if scope not in self.environment.functions:
-                self.environment.functions[scope] = {}
+        return "{}:{}".format(scope, name)
+        
+    def _do_setvar(self):
+        arguments = self._eval_args()
+        sc = "::".join(tuple(filter(lambda x: x is not None, ((self.scope if self.scope is not None else None), (arguments[2] if len(arguments) > 2 else None)))))
+        self.environment.variables[(sc, arguments[0])] = arguments[1]
+        
+    def _setvar_key(self):
+        key = self._var_key
+        
+        if key is None:
+            arguments = self._const_args
+            sc = "::".join(tuple(filter(lambda x: x is not None, ((self.scope if self.scope is not None else None), (arguments[2] if len(arguments) > 2 else None)))))
+            key = self._var_key = (_intern_name(sc), arguments[0])
             
-            f = Function(self.environment, scope, name, *instructions)
-            self.environment.functions[scope][name] = f
+        return key
+        
+    def _do_setvar_const(self):
+        self.environment.variables[self._setvar_key()] = self.arguments[1].__value__()
+        
+    def _do_gstvar(self):
+        arguments = self._eval_args()
+        self.environment.variables[("", arguments[0])] = arguments[1]
+        
+    def _do_delvar(self):
+        arguments = self._eval_args()
+        self.environment.variables.pop((self.scope, arguments[0]), None)
             
-            def set_function(ioo):
-                if type(ioo) is Operation:
-                    ioo.scope = f.scope or ioo.scope
-                    ioo.function = (ioo.function if ioo.function is not None else f)
-                
-                    for o in ioo.operands:
-                        set_function(o)
-                        
-                elif type(ioo) is Instruction:
-                    ioo.scope = f.scope or ioo.scope
-                    ioo.function = (ioo.function if ioo.function is not None else f)
-                
-                    for o in ioo.arguments:
-                        set_function(o)
-                
+    def _do_mkfunc(self):
+        arguments = self._eval_args()
+        name = arguments[0]
+        scope = (self.scope + ":" if self.scope is not None else "") + (arguments[1] if arguments[1] is not None else "")
+        instructions = arguments[2:]
+        
+        if scope is not None:
             for i in instructions:
-                set_function(i)
-            
-        elif self.opcode == "RETURN":
-            if self.function:
-                self.environment.return_stack[self.function] = arguments[0]
-                
-            else:
-                self.environment.last_return = arguments[0]
-                
-            return "SETRES"
-            
-        elif self.opcode == "TERMIN":
-            return "TERMINATE"
-            
-        elif self.opcode == "JUMPIF":
-            if arguments[0]:
-                return "LJUMP:{}:".format(self.scope) + str(arguments[1])
-            
-        elif self.opcode == "JUMPIN":
-            if not arguments[0]:
-                return "LJUMP:{}:".format(self.scope) + str(arguments[1])
+                i.scope = scope
+        
+        f = Function(self.environment, scope, name, *instructions)
+        self.environment.functions[(scope, name)] = f
+        
+        def set_function(ioo):
+            if type(ioo) is Operation:
+                ioo.scope = f.scope or ioo.scope
+                ioo.function = (ioo.function if ioo.function is not None else f)
             
-        elif self.opcode == "JUMPTO":
-            return "JUMP:" + str(arguments[0])
+                for o in ioo.operands:
+                    set_function(o)
+                    
+            elif type(ioo) is Instruction:
+                ioo.scope = f.scope or ioo.scope
+                ioo.function = (ioo.function if ioo.function is not None else f)
             
-        elif self.opcode == "MLABEL":
-            return "LABEL:{}:{}".format((self.scope if self.scope is not None else ''), arguments[0])
+                for o in ioo.arguments:
+                    set_function(o)
             
-        elif self.opcode == "JMPOFF":
-            return "OJUMP:" + str(arguments[0])
+        for i in instructions:
+            set_function(i)
+        
+    def _do_return(self):
+        arguments = self._eval_args()
+    
+        if self.function:
+            self.environment.return_stack[id(self.function)] = arguments[0]
             
-        elif self.opcode == "JUMPLB":
-            return "LJUMP:{}:".format(arguments[1] if len(arguments) > 1 else (self.scope if self.scope is not None else "")) + arguments[0]
+        else:
+            self.environment.last_return = arguments[0]
             
-        elif self.opcode == "GJUMPL":
-            self.environment._global_jump("{}:{}".format(arguments[1] if len(arguments) > 1 else self.scope, arguments[0]))
+        return (ST_SETRES, None)
+        
+    def _do_termin(self):
+        return (ST_TERMINATE, None)
+        
+    def _do_jumpif(self):
+        arguments = self._eval_args()
+    
+        if arguments[0]:
+            return (ST_LJUMP, self._label_key(arguments[1]))
+        
+    def _do_jumpin(self):
+        arguments = self._eval_args()
+    
+        if not arguments[0]:
+            return (ST_LJUMP, self._label_key(arguments[1]))
+        
+    def _do_jumpto(self):
+        return (ST_JUMP, self.arguments[0].__value__())
+        
+    def _do_mlabel(self):
+        arguments = self._eval_args()
+        return (ST_LABEL, self._label_key(arguments[0]))
+        
+    def _do_marked_label(self):
+        return # already marked by resolve_labels
+        
+    def _do_resolved_jumpif(self):
+        if self._eval_args()[0]:
+            return self._jump
             
-        elif self.opcode == "EXFILE":
-            self.environment.execute(open(self.arguments[0], 'rb').read())
-                        
-        elif self.opcode == "PRINTV":
-            if self.environment.pstream is sys.stdout or self.environment.pstream is sys.stderr:
-                self.environment.pstream.write(" ".join(tuple(map(str, arguments))) + "\n")
+    def _do_resolved_jumpin(self):
+        if not self._eval_args()[0]:
+            return self._jump
             
-            else:
-                self.environment.pstream.write(bytes(" ".join(tuple(map(str, arguments))), 'utf-8') + b"\n")
+    def _do_resolved_jumplb(self):
+        return self._jump
+        
+    def _do_cached_jump(self):
+        return self._jump
+        
+    def _do_jmpoff(self):
+        return (ST_OJUMP, self.arguments[0].__value__())
+        
+    def _do_jumplb(self):
+        arguments = self._eval_args()
+        return (ST_LJUMP, self._label_key(arguments[0], (arguments[1] if len(arguments) > 1 else None)))
+        
+    def _do_gjumpl(self):
+        arguments = self._eval_args()
+        self.environment._global_jump(self._label_key(arguments[0], (arguments[1] if len(arguments) > 1 else None)))
+        
+    def _do_exfile(self):
+        arguments = self._eval_args()
+        env = self.environment
+        instructions = env._file_cache.get(arguments[0])
+        
+        if instructions is None:
+            with map_file(arguments[0]) as data:
+                instructions = env.read(data, arguments[0])
+                
+            env._file_cache[arguments[0]] = instructions
             
-        elif self.opcode == "NULLEV":
-            return # we already evaluated the arguments anyway :P
+        # the included file has its own positions and labels
+        pos, labels = env.pos, env._labels
+        
+        try:
+            env._execute_prepared(instructions)
             
-        elif self.opcode == "CATCHE":
-            for a in operands[1:]:
-                if type(a) is Instruction:
-                    try:
-                        a.execute()
-                        
-                    except BaseException:
-                        operands[0].execute()
-                        break
+        finally:
+            env.pos, env._labels = pos, labels
                     
-                else:
-                    raise RuntimeError("Non-instruction given to CATCHE.")
+    def _do_printv(self):
+        self.environment._write_line(" ".join(map(str, self._eval_args())) + "\n")
+        
+    def _do_nullev(self):
+        self._eval_args() # we only need the arguments evaluated :P
+        
+    def _do_catche(self):
+        arguments = self._eval_args()
+    
+        for a in arguments[1:]:
+            if type(a) is Instruction:
+                try:
+                    a.execute()
+                    
+                except BaseException:
+                    arguments[0].execute()
+                    break
+                
+            else:
+                raise RuntimeError("Non-instruction given to CATCHE.")
+            
+    _HANDLERS = {
+        "SETVAR": _do_setvar,
+        "GSTVAR": _do_gstvar,
+        "DELVAR": _do_delvar,
+        "MKFUNC": _do_mkfunc,
+        "RETURN": _do_return,
+        "TERMIN": _do_termin,
+        "JUMPIF": _do_jumpif,
+        "JUMPIN": _do_jumpin,
+        "JUMPTO": _do_jumpto,
+        "JUMPLB": _do_jumplb,
+        "MLABEL": _do_mlabel,
+        "EXFILE": _do_exfile,
+        "PRINTV": _do_printv,
+        "NULLEV": _do_nullev,
+        "CATCHE": _do_catche,
+        "JMPOFF": _do_jmpoff,
+        "GJUMPL": _do_gjumpl,
+    }
+    
+    # indexed by opcode byte
+    _OP_HANDLERS = tuple(map(_HANDLERS.__getitem__, BASE_OPCODES))
+        
+    _OFFSET_JUMPS = {
+        "JUMPTO": ST_JUMP,
+        "JMPOFF": ST_OJUMP,
+    }
+    
+    _RESOLVED_JUMPS = {
+        "JUMPIF": _do_resolved_jumpif,
+        "JUMPIN": _do_resolved_jumpin,
+        "JUMPLB": _do_resolved_jumplb,
+    }
             
     def __value__(self):
         return self
@@ -727,45 +1712,168 @@ class VersionCheckError(BaseException):
     def __str__(self):
         return self.msg
         
+class TruncatedCodeError(BaseException):
+    def __init__(self, msg):
+        self.msg = msg
+        
+    def __str__(self):
+        return self.msg
+        
+# Assembly Tokenizing
+# The scanners jump between the characters that matter to them; everything
+# in between is taken as whole slices.
+_PARENTHETIC_CHARS = re.compile(r'["\'\[\](){}]')
+_ARGUMENT_CHARS = re.compile(r'["\'\[{( ,]')
+
+# ASCII digits only; str.isdigit also takes the likes of '²', which int() refuses
+_INT_LITERAL = re.compile(r'-?[0-9]+')
+_FLOAT_LITERAL = re.compile(r'-?(?:[0-9]+\.[0-9]*|\.[0-9]+)')
+_BASED_LITERAL = re.compile(r'0x[0-9A-Fa-f]+|0o[0-7]+|0b[01]+') # int(..., 0) reads the prefix
+
+# parsed arguments that Netbyte.parse_arg may hand out more than once
+_ARG_CACHE_TYPES = frozenset((str, int, float, bool, type(None), SpecialNull))
+_ARG_CACHE_MAX = 10000
+
+# Source Cleanup (in the order parse applies them)
+# Line comments are dropped and space runs collapsed in the same pass: the
+# group is empty for a comment, and keeps one space of a run.
+_LINE_COMMENT_OR_SPACES = re.compile(r'//[^\n]+|( ) +')
+_BLOCK_COMMENT = re.compile(r' ?/\*[\n.]*?\*/ ?', re.S)
+_LINE_CONTINUATION = re.compile(r'\\\s*?\n')
+_STATEMENT_END = re.compile(r'(?<!\\);')
+_WHITESPACE = re.compile(r'\s+')
+
+# \x00 to \xff with lowercase digits, as string literals spell them
+_HEX_ESCAPES = tuple((r'\x{}{}'.format((0 if i < 16 else ''), hex(i)[2:]), chr(i)) for i in range(256))
+
+def _parenthetic_end(line, start=0, end=None):
+    if end is None:
+        end = len(line)
+        
+    level = -1
+    done = False
+    quoted = False
+    pos = start
+    
+    for m in _PARENTHETIC_CHARS.finditer(line, start, end):
+        i = m.start()
+        char = line[i]
+        
+        # plain characters only count while inside the brackets
+        if i > pos and level > -1:
+            done = True
+            
+        pos = i + 1
+        
+        if char in '"\'':
+            quoted = not quoted
+            
+        if char in "])}" and not quoted:
+            level -= 1
+            
+        if level > -1:
+            done = True
+            
+        if char in "[({" and not quoted:
+            level += 1
+            
+        if level < 0 and done:
+            return pos
+            
+    return end
+    
 class Netbyte(object):
     VERSION = "0.1.6"
 
+    # Functions called this many times get their body compiled to Python
+    # source (see compile_function); 0 disables it. Can be set per instance.
+    JIT_THRESHOLD = 1000
+
     def __init__(self, print_stream=sys.stdout, script_args=()):
-        script_args = dict(script_args)
-    
+        # Variables and functions are keyed by (scope, name).
         self.variables = {
-            "": {
-                "__NETBYTE__": self
-            },
-            
-            "__PYARGS__": script_args
+            ("", "__NETBYTE__"): self
         }
+        
+        for name, value in dict(script_args).items():
+            self.variables[("__PYARGS__", name)] = value
+            
         self.functions = {}
-        self.return_stack = {}
+        self.return_stack = {} # id(function) -> pending return value
         self.files = []
         self.pstream = print_stream
         self.last_return = None
+        self.pos = 0
         self._labels = {}
+        self._native_cache = {}
+        self._file_cache = {} # path -> parsed instructions, for EXFILE
+        self._arg_cache = {} # argument text -> parsed Literal
+        
+    @property
+    def pstream(self):
+        return self._pstream
+        
+    # PRINTV writes text to the standard streams and UTF-8 bytes to
+    # anything else; the choice is made once per stream.
+    @pstream.setter
+    def pstream(self, stream):
+        self._pstream = stream
+        
+        if stream is sys.stdout or stream is sys.stderr:
+            self._write_line = stream.write
+            
+        else:
+            write = stream.write
+            self._write_line = lambda line: write(line.encode('utf-8'))
         
     def __setitem__(self, name, value):
-        self.variables["__PYARGS__"][name] = value
+        self.variables[("__PYARGS__", name)] = value
         
     def __getitem__(self, name):
-        return self.variables["__PYARGS__"][name]
+        return self.variables[("__PYARGS__", name)]
         
+    def _native_function(self, name, module=None):
+        key = (module, name)
+        func = self._native_cache.get(key)
+        
+        if func is None:
+            if module is None:
+                if name in globals():
+                    func = globals()[name]
+                    
+                elif hasattr(builtins, name):
+                    func = getattr(builtins, name)
+                    
+                else:
+                    raise NativeFunctionError("ERROR:NativeFunctionError:Native function not found in builtins nor globals: '{}'".format(name))
+                    
+            else:
+                mod = importlib.import_module(module)
+            
+                if not hasattr(mod, name):
+                    raise NativeFunctionError("Native function not found in '{}' module: '{}'".format(module, name))
+                    
+                func = getattr(mod, name)
+                
+            self._native_cache[key] = func
+            
+        return func
+        
+    # returns the string and the bytes read, header included
     def _get_str(self, data, pos):
-        length = struct.unpack("=I", data[pos: pos + 4])[0]
+        length = _U32.unpack_from(data, pos)[0]
         sd = data[pos + 4: pos + 4 + length]
-        return sd.decode('utf-8'), length
+        return sys.intern(str(sd, 'utf-8')), length + 4
         
     def _dump_str(self, string):
-        return struct.pack("=L{}s".format(len(string)), len(string), string)
+        data = string.encode('utf-8')
+        return _U32.pack(len(data)) + data
         
     def read_literal(self, data, pos, scope=None, absolute_pos=None, superlen=None):
         if absolute_pos is None:
             absolute_pos = pos
         
-        length = struct.unpack("=L", data[pos: pos + 4])[0]
+        length = _U32.unpack_from(data, pos)[0]
         sd = data[pos + 4:pos + 5 + length]
         ltype = TYPES[data[pos + 4]]
         sd = sd[1:]
@@ -781,69 +1889,50 @@ class Netbyte(object):
         elif ltype == "FUNCTN":
             apos = absolute_pos
         
-            name, nl = _get_str(sd, 0)
+            name, nl = self._get_str(sd, 0)
             apos += nl
             sd = sd[nl:]
-            scope, sl = _get_str(sd, 0)
+            scope, sl = self._get_str(sd, 0)
             apos += sl
             sd = sd[sl:]
             
-            blen = struct.unpack("=L", sd[:4])
+            blen = _U32.unpack_from(sd, 0)[0]
             instructions = []
             apos += 4
-            sd = sd[4:]
+            sd = sd[4:4 + blen]
             
+            # each instruction has a length of its own in front
             while len(sd) > 0:
-                i, l = self.read_instruction(sd, 0, scope, apos)
-                instructions.push(i)
-                apos += l
-                sd = sd[l:]
+                l, i = self.read_instruction(sd, 4, scope, apos + 4)
+                instructions.append(i)
+                apos += 4 + l
+                sd = sd[4 + l:]
             
             return Literal(self, Function(self, scope, name, *instructions))
                
-        elif ltype == "FUNCPN":
-            apos = absolute_pos
-        
-            name, nl = _get_str(sd, 0)
-            apos += nl
-            sd = sd[nl:]
-            scope, sl = _get_str(sd, 0)
-            apos += sl
-            sd = sd[sl:]
+        elif ltype == "FUNCPT":
+            name, nl = self._get_str(sd, 0)
+            scope = self._get_str(sd, nl)[0]
             
             return FunctionPointer(self, name, scope)
             
         elif ltype == "ITNUMS":
-            fmts = {
-                1: "b",
-                2: "h",
-                4: "i",
-                8: "q"
-            }
-        
-            return Literal(self, struct.unpack("=" + fmts[len(sd)], sd)[0])
+            return Literal(self, int.from_bytes(sd, sys.byteorder, signed=True))
             
         elif ltype == "ITNUMU":
-            fmts = {
-                1: "B",
-                2: "H",
-                4: "I",
-                8: "Q"
-            }
-        
-            return Literal(self, struct.unpack("=" + fmts[len(sd)], sd)[0])
+            return Literal(self, int.from_bytes(sd, sys.byteorder, signed=False))
             
         elif ltype == "FLTNUM":
             # print(">", ltype, length, superlen, struct.unpack("=f", sd[:4])[0], "@", hex(absolute_pos))
-            return Literal(self, struct.unpack("=f", sd[:4])[0])
+            return Literal(self, _F32.unpack_from(sd, 0)[0])
             
         elif ltype == "DBLNUM":
             # print(">", ltype, length, superlen, struct.unpack("=d", sd[:8])[0], "@", hex(absolute_pos))
-            return Literal(self, struct.unpack("=d", sd[:8])[0])
+            return Literal(self, _F64.unpack_from(sd, 0)[0])
             
         elif ltype == "STRING":
             # print(">", ltype, length, superlen, repr(sd.decode('utf-8')), "@", hex(absolute_pos))
-            return Literal(self, sd.decode('utf-8'))
+            return Literal(self, _intern_name(str(sd, 'utf-8')))
             
         elif ltype == "RTINST":
             # print(">", ltype, length, superlen, "@", hex(absolute_pos))
@@ -854,51 +1943,69 @@ class Netbyte(object):
             
         elif ltype == "VARRAY":
             res = []
+            offset = 0
             
-            while len(sd) > 4:
-                sublen = struct.unpack("=L", sd[:4])
-                sd = sd[4:]
-                res.append(resd_expression(sd[:sublen]))
-                sd = sd[sublen:]
+            # the elements are whole expressions, headers included
+            while len(sd) - offset > 4:
+                sublen, e = self.read_expression(sd, offset, scope, absolute_pos=absolute_pos + 5 + offset)
+                res.append(e)
+                offset += sublen
             
             return Literal(self, res)
         
     def read_expression(self, data, pos, scope=None, absolute_pos=None, level=0, function=None):
-        length = struct.unpack("=L", data[pos: pos + 4])[0]
-        
-        if length == 0:
-            # assume NULLVL (null value)
-            return 4, None
-        
-        # print(hex(absolute_pos if absolute_pos is not None else pos), length, "L" + str(level))
-        expr = data[pos + 4: pos + 4 + length]
-        
-        # print(absolute_pos, length, expr[0])
+        # Parses iteratively, so deeply nested expressions don't hit the
+        # recursion limit. Each open operation is kept on the stack as
+        # [operator, operand view, read position, expression length,
+        #  arguments, absolute position, total length].
+        if absolute_pos is None:
+            absolute_pos = pos
+            
+        stack = []
         
-        if expr[0] > 0:
-            operator = EXPR_OPCODES[expr[0] - 1]
-            # print(operator)
-            # print(">", hex((absolute_pos if absolute_pos is not None else pos) + 3), expr[0], operator)
-            rpos = 0
-            arguments = []
+        while True:
+            length = _U32.unpack_from(data, pos)[0]
             
-            while rpos + 1 < len(expr):
-                offset, arg = self.read_expression(expr[1:], rpos, absolute_pos=(absolute_pos if absolute_pos is not None else pos) + 5 + rpos, level=level + 1)
-                rpos += offset 
-                arguments.append(arg)
+            if length == 0:
+                # assume NULLVL (null value)
+                done = (4, None)
                 
-            return 4 + length, Operation(self, operator, *arguments, scope=scope, function=function)
-        
-        else:
-            return 4 + length, self.read_literal(expr[1:], 0, scope, absolute_pos=(absolute_pos if absolute_pos is not None else pos) + 5, superlen=length)
+            else:
+                expr = data[pos + 4: pos + 4 + length]
+                
+                if expr[0] > 0:
+                    stack.append([expr[0] - 1, expr[1:], 0, len(expr), [], absolute_pos, 4 + length])
+                    done = None
+                    
+                else:
+                    # operands of nested operations don't get the scope, like before
+                    done = (4 + length, self.read_literal(expr[1:], 0, (scope if not stack else None), absolute_pos=absolute_pos + 5, superlen=length))
+                    
+            while True:
+                if done is not None:
+                    if not stack:
+                        return done
+                        
+                    frame = stack[-1]
+                    frame[2] += done[0]
+                    frame[4].append(done[1])
+                    
+                frame = stack[-1]
+                
+                if frame[2] + 1 < frame[3]:
+                    data, pos, absolute_pos = frame[1], frame[2], frame[5] + 5 + frame[2]
+                    break
+                    
+                stack.pop()
+                done = (frame[6], Operation(self, frame[0], *frame[4], scope=(scope if not stack else None), function=(function if not stack else None)))
         
     def read_instruction(self, data, pos, scope=None, absolute_pos=None, function=None):
         if absolute_pos is None:
             absolute_pos = pos
     
-        length = struct.unpack("=L", data[pos: pos + 4])[0]
+        length = _U32.unpack_from(data, pos)[0]
         instruction = data[pos + 4: pos + 4 + length]
-        opcode = BASE_OPCODES[instruction[0]]
+        opcode = instruction[0]
         
         instruction = instruction[1:]
         
@@ -917,7 +2024,7 @@ class Netbyte(object):
         # print(opcode, "of length", length)
         
         while rpos + 1 < length:
-            offset, arg = self.read_expression(instruction[rpos:], 0, scope, absolute_pos=absolute_pos + 5 + rpos, function=function)
+            offset, arg = self.read_expression(instruction, rpos, scope, absolute_pos=absolute_pos + 5 + rpos, function=function)
             rpos += offset
             arguments.append(arg)
             
@@ -925,291 +2032,333 @@ class Netbyte(object):
             
         # print(absolute_pos, length, opcode, len(arguments))
             
-        return length + 4, Instruction(self, scope, opcode.upper(), *arguments, function=function)
+        return length + 4, Instruction(self, scope, opcode, *arguments, function=function)
         
-    def read(self, data, name=None):
-        vlen = struct.unpack("=H", data[:2])[0]
+    def _read_header(self, data, name=None):
+        # readers only slice this view; bytes get copied once strings are decoded
+        data = memoryview(data)
+        vlen = _U16.unpack_from(data, 0)[0]
         data = data[2:]
-        v = data[:vlen].decode('utf-8')
-        data = data[vlen:]
+        v = str(data[:vlen], 'utf-8')
     
         if v != type(self).VERSION:
             raise VersionCheckError("The Netbyte code '{}' given to the interpreter is in the wrong version: '{}' instead of '{}'!".format(name, v, type(self).VERSION))
-    
+            
+        return data[vlen:]
+        
+    def _iter_instructions(self, data):
         pos = 0
-        instructions = []
         
         while pos < len(data):
             offset, instruction = self.read_instruction(data, pos, absolute_pos=pos)
             pos += offset
-            instructions.append(instruction)
+            yield instruction
             
-        return instructions
+    def _is_linear(self, data, name=None):
+        # Only walks the top-level lengths and opcode bytes; nothing is
+        # parsed. Every instruction must end within the data, so a truncated
+        # program fails before any of it runs.
+        linear = True
+        pos = 0
+        count = len(data)
+        
+        while pos < count:
+            length = _U32.unpack_from(data, pos)[0] if count - pos > 4 else 0
+            
+            if not 0 < length <= count - pos - 4:
+                raise TruncatedCodeError("The Netbyte code '{}' given to the interpreter is truncated: the instruction at {} runs past its end!".format(name, hex(pos)))
+                
+            if BASE_OPCODES[data[pos + 4]] in _FLOW_OPCODES:
+                linear = False
+                
+            pos += 4 + length
+            
+        return linear
+        
+    def read(self, data, name=None):
+        return list(self._iter_instructions(self._read_header(data, name)))
         
     def _global_jump(self, lb):
         self.pos = self._labels[lb] - 1
         
-    def execute(self, data, name=None):
-        instructions = self.read(data, name)
-        pos = 0
-        
+    def _execute_stream(self, instructions):
+        # Runs each instruction as soon as it is parsed, and drops it after.
         res = None
         
-        # Static Labels
-        for i in instructions:        
-            if i.opcode == "MLABEL":
-                status = i.execute()
+        for i in instructions:
+            status = i.execute()
+            
+            if status is None:
+                continue
+                
+            code = status[0]
+            
+            if code == ST_SETRES:
+                res = self.last_return
+                self.last_return = None
                 
-                if status[:6] == "LABEL:":
-                    self._labels[status[6:]] = pos + 1
+            elif code == ST_TERMINATE:
+                break
                 
-            pos += 1
+        return res
+        
+    def execute(self, data, name=None):
+        data = self._read_header(data, name)
+        
+        # Programs without any jump can't revisit an instruction.
+        if self._is_linear(data, name):
+            return self._execute_stream(self._iter_instructions(data))
+    
+        return self._execute_prepared(list(self._iter_instructions(data)))
+        
+    def _execute_prepared(self, instructions):
+        res = None
+        
+        self._labels = labels = resolve_labels(instructions)
+        handlers = instruction_handlers(instructions, True)
+        count = len(instructions)
+        pos = self.pos = 0
             
-        self.pos = 0
+        while pos < count:
+            status = handlers[pos](instructions[pos])
+            pos = self.pos # GJUMP moves the global position directly
             
-        while self.pos < len(instructions):
-            i = instructions[self.pos]
-            status = i.execute()
+            if status is None:
+                pos = self.pos = pos + 1
+                continue
+                
+            code = status[0]
             
-            if status is not None:
-                if status == "SETRES":
-                    res = self.last_return
-                    self.last_return = None
-                    
-                elif status == "TERMINATE":
-                    break
-                    
-                elif status[:5] == "JUMP:":
-                    self.pos = int(status[5:])
-                    
-                elif status[:6] == "OJUMP:":
-                    self.pos += int(status[5:])
-                    
-                elif status[:6] == "LJUMP:":
-                    self.pos = self._labels[status[6:]]
-                    
-                elif status[:6] == "LABEL:":
-                    self._labels[status[6:]] = self.pos + 1
+            if code == ST_JUMP:
+                pos = self.pos = status[1]
+                continue
+                
+            elif code == ST_LJUMP:
+                pos = self.pos = labels[status[1]]
+                continue
+                
+            elif code == ST_OJUMP:
+                pos = self.pos = pos + status[1]
+                continue
+                
+            elif code == ST_SETRES:
+                res = self.last_return
+                self.last_return = None
                 
-            if status is None or (status[:5] != "JUMP:" and status[:6] != "LJUMP:" and status[:6] != "OJUMP:"):
-                self.pos += 1
+            elif code == ST_TERMINATE:
+                break
+                
+            elif code == ST_LABEL:
+                labels[status[1]] = pos + 1
+                
+            pos = self.pos = pos + 1
                 
         return res
 
-    def dump_expression(self, exp, debug=False, level=0):    
-        res = b''
-    
+    def dump_expression(self, exp, debug=False, level=0):
+        out = bytearray()
+        self._dump_expression_into(out, exp, debug, level)
+        return bytes(out)
+        
+    # The dumpers append to one buffer; length headers are reserved up front
+    # and filled in once the data after them is written.
+    def _dump_expression_into(self, out, exp, debug=False, level=0):
         if debug:
             print(" . " * level + " >", type(exp).__name__, dbgvalue(exp))
-    
-        if type(exp) is Instruction:
-            r = self.dump(exp, debug=debug, level=level + 1)
-            res = struct.pack("=LBLB", len(r) + 6, 0, len(r) + 1, TYPES.index("RTINST")) + r
-            
-            if debug: 
-                pass
-                # print(" . " * level, len(r) + 5, res.hex())
-                
-            return res
             
-        elif type(exp) is Operation:
-            ores = struct.pack("=B", EXPR_OPCODES.index(exp.operator) + 1)
-
-            for o in exp.operands:                    
-                r = self.dump_expression(o, debug=debug, level=level + 1)
-                ores += r
-                
-            # ores = struct.pack("=L", len(ores)) + ores
-            res += ores
+        if type(exp) is Instruction:
+            start = len(out)
+            out += bytes(_LBLB.size)
+            self._dump_into(out, (exp,), debug, level + 1)
+            size = len(out) - start - _LBLB.size
+            _LBLB.pack_into(out, start, size + 6, 0, size + 1, _TYPE_ID["RTINST"])
+            return
             
         elif type(exp) is FunctionPointer:
             ares = self._dump_str(exp.fname) + self._dump_str(exp.fscope)
-            return b'\x00' + struct.pack("=LB", len(ares) + 1, TYPES.index("FUNCPT")) + ares
-        
-        elif type(exp) is Literal:
-            res = b'\x00'
+            out += _U32.pack(1 + _LB.size + len(ares))
+            out += b'\x00'
+            out += _LB.pack(len(ares), _TYPE_ID["FUNCPT"])
+            out += ares
+            return
+            
+        elif type(exp) is Literal and type(exp.value) not in _DUMPED_TYPES and type(exp.value) is not Function:
+            out += _LBLB.pack(6, 0, 1, _TYPE_ID["SPNULL" if exp.value is SPNULL else "NULLVL"])
+            return
+            
+        start = len(out)
+        out += bytes(4)
         
-            if type(exp.value) is str:
-                r = struct.pack('=LB{}s'.format(len(exp.value) + 1), len(exp.value.encode('utf-8')), TYPES.index('STRING'), exp.value.encode('utf-8'))
-                res += r
-                
-            elif type(exp.value) in (tuple, list):
-                ares = b''
-                
-                for i in exp.value:
-                    ares += self.dump_expression(i)
+        if type(exp) is Operation:
+            out.append((exp.op_id if exp.op_id is not None else _EXPR_ID[exp.operator]) + 1)
             
-                res += struct.pack("=LB", len(ares) + 1, TYPES.index('VARRAY')) + ares
-                
-            elif type(exp.value) is Function:
-                body = b''
+            for o in exp.operands:
+                self._dump_expression_into(out, o, debug, level + 1)
                 
-                for i in exp.value.instructions:
-                    ins = self.dump(i, debug=debug, level=level + 1)
-                    body += struct.pack("=L", len(ins)) + ins
+        elif type(exp) is Literal:
+            out.append(0)
+            value = exp.value
             
-                ares = self._dump_str(exp.value.name) + self._dump_str(exp.value.scope) + struct.pack("=L", len(body)) + body
-                res += struct.pack("=LB", len(ares) + 1, TYPES.index("FUNCTN"), ares)
-                
-            elif type(exp.value) is bool:
-                res += struct.pack("=LB?", 2, TYPES.index("BOOLTF"), exp.value)
+            if type(value) is str:
+                data = value.encode('utf-8')
+                out += _LB.pack(len(data), _TYPE_ID["STRING"])
+                out += data
+                out += b'\x00'
                 
-            elif type(exp.value) is int:
-                if exp.value > 2147483647:
-                    f = 'q'
+            elif type(value) in (tuple, list):
+                head = len(out)
+                out += bytes(_LB.size)
                 
-                elif exp.value > 32767:
-                    f = 'i'
-                
-                elif exp.value > 127:
-                    f = 'h'
-                    
-                else:
-                    f = 'b'
-            
-                r = struct.pack('=' + f, exp.value)
-                res += struct.pack('=L', len(r)) + struct.pack('=B', TYPES.index('ITNUMS')) + r
+                for i in value:
+                    self._dump_expression_into(out, i)
                     
-            elif type(exp.value) is float:
-                r = struct.pack('=d', exp.value)
-                res += struct.pack('=L', len(r))
-                res += struct.pack('=B', TYPES.index('DBLNUM'))
-                res += r
-                
-            elif exp.value is SPNULL:
-                res = struct.pack('=LBLB', 6, 0, 1, TYPES.index("SPNULL"))
-                
-                if debug:
-                    pass
-                    # print(" . " * level, res.hex())
+                _LB.pack_into(out, head, len(out) - head - _LB.size + 1, _TYPE_ID["VARRAY"])
+                
+            elif type(value) is Function:
+                head = len(out)
+                out += bytes(_LB.size)
+                out += self._dump_str(value.name)
+                out += self._dump_str(value.scope)
+                body = len(out)
+                out += bytes(4)
+                
+                for i in value.instructions:
+                    ins = len(out)
+                    out += bytes(4)
+                    self._dump_into(out, (i,), debug, level + 1)
+                    _U32.pack_into(out, ins, len(out) - ins - 4)
                     
-                return res
+                _U32.pack_into(out, body, len(out) - body - 4)
+                _LB.pack_into(out, head, len(out) - head - _LB.size + 1, _TYPE_ID["FUNCTN"])
                 
-            else:
-                res = struct.pack('=LBLB', 6, 0, 1, TYPES.index('NULLVL'))
+            elif type(value) is bool:
+                out += _LBBOOL.pack(2, _TYPE_ID["BOOLTF"], value)
                 
-                if debug: 
-                    pass
-                    # print(" . " * level, res.hex())
+            elif type(value) is int:
+                width = _int_width(value)
                 
-                return res
-        
-        res = struct.pack("=L", len(res)) + res
-        
-        if debug: 
-            pass
-            # print(" . " * level, res.hex())
+                # ITNUMS is read back at any width, so wider ints don't need a struct
+                r = (_INT_STRUCTS[width].pack(value) if width in _INT_STRUCTS else value.to_bytes(width, sys.byteorder, signed=True))
+                out += _LB.pack(len(r), _TYPE_ID["ITNUMS"])
+                out += r
                 
-        return res
+            else:
+                out += _LB.pack(_F64.size, _TYPE_ID["DBLNUM"])
+                out += _F64.pack(value)
+                
+        _U32.pack_into(out, start, len(out) - start - 4)
         
     def dump(self, *instructions, debug=False, level=0):
-        res = b''
-    
+        out = bytearray()
+        self._dump_into(out, instructions, debug, level)
+        return bytes(out)
+        
+    def _dump_into(self, out, instructions, debug=False, level=0):
         for i in instructions:
             if debug:
                 print(" . " * level + (i.opcode))
                 
-            ires = struct.pack('=B', BASE_OPCODES.index(i.opcode))
+            start = len(out)
+            out += bytes(4)
+            out.append(i.opcode_id if i.opcode_id is not None else _BASE_ID[i.opcode])
             
             for a in i.arguments:
-                ires += self.dump_expression(a, debug=debug, level=level + 1)
-            
-            res += struct.pack("=L", len(ires)) + ires
-            
-            # print(dbgvalue(i), ires)
+                self._dump_expression_into(out, a, debug, level + 1)
+                
+            _U32.pack_into(out, start, len(out) - start - 4)
             
-        return res
-        
     def compile(self, *instructions, debug=False):
         return struct.pack('=H{}s'.format(len(type(self).VERSION)), len(type(self).VERSION), type(self).VERSION.encode('utf-8')) \
             + self.dump(*instructions, debug=debug)
         
     def execute_file(self, filename): 
-        return self.execute(open(filename, 'rb').read(), filename)
+        with map_file(filename) as data:
+            return self.execute(data, filename)
         
     def parenthetic_parse(self, line):
-        level = -1
-        res = ""
-        done = False
-        quoted = False
+        return line[:_parenthetic_end(line)]
         
-        for char in line:
-            res += char
+    # start and end bound the part of line to split, so callers need not
+    # slice it out first
+    def argument_tree(self, line, start=0, end=None):
+        if end is None:
+            end = len(line)
             
-            if char in '"\'':
-                quoted = not quoted
-            
-            if char in "])}" and not quoted:
-                level -= 1
-                # print(level, char, res)
-                
-            if level > -1:
-                done = True    
-            
-            if char in "[({" and not quoted:
-                level += 1
-                # print(level, char, res)
-                     
-            if level < 0 and done:
-                break          
-            
-        return res
-
-    def argument_tree(self, line):
         res = []
-        sub = ""
-        parenthetic = False
-        remaining = line
+        pos = start # from here on, start is that of the argument being read
         quoted = False
         
-        while len(remaining) > 0:
-            char = remaining[0]
+        while True:
+            m = _ARGUMENT_CHARS.search(line, pos, end)
+            
+            if m is None:
+                break
+                
+            i = m.start()
+            char = line[i]
+            pos = i + 1
             
             if char in '"\'':
                 quoted = not quoted
-            
-            if char in "[{(":
-                p = self.parenthetic_parse(remaining)
-                # print("#", sub + p)
-                res.append(sub + p)
-                remaining = remaining[len(p):]
-                sub = ""
-            
-            else:
-                remaining = remaining[1:]
-            
-                if char in ' ,' and not quoted:
-                    res.append(sub)
-                    sub = ""
                 
-                else:
-                    sub += char
+            elif char in "[{(":
+                pos = _parenthetic_end(line, i, end)
+                res.append(line[start:pos])
+                start = pos
                 
-        if sub != "":
-            res.append(sub)
+            elif not quoted:
+                res.append(line[start:i])
+                start = pos
+                
+        if start < end:
+            res.append(line[start:end])
             
         return res
         
+    # Only scalar Literals are shared: other nodes get their scope and function
+    # set once they're placed, and array values are mutable.
     def parse_arg(self, argument):
+        if type(argument) is not str:
+            return self._parse_arg(argument)
+            
+        cache = self._arg_cache
+        res = cache.get(argument)
+        
+        if res is None:
+            res = self._parse_arg(argument)
+            
+            if type(res) is Literal and type(res.value) in _ARG_CACHE_TYPES:
+                if len(cache) >= _ARG_CACHE_MAX:
+                    del cache[next(iter(cache))]
+                    
+                cache[argument] = res
+                
+        return res
+        
+    def _parse_arg(self, argument):
         if type(argument) is str:
             if len(argument) > 1 and argument[0] in '"\'' and argument[-1] == argument[0]:
                 argument = argument[1:-1]
             
-                for i in range(256):
-                    argument = argument.replace(r'\x{}{}'.format((0 if i < 16 else ''), hex(i)[2:]), chr(i))
+                # in order, since an escaped backslash can start a later escape
+                for escape, char in _HEX_ESCAPES:
+                    if '\\x' not in argument:
+                        break
+                        
+                    argument = argument.replace(escape, char)
             
-                return Literal(self, argument
+                return Literal(self, _intern_name(argument
                     .replace(r'\n', '\n')
                     .replace(r'\r', '\r')
                     .replace(r'\"', '"')
                     .replace(r'\'', "'")
                     .replace('\\\\', '\\')
-                )
+                ))
             
             elif argument[0] == "*": # dynamic function call
                 argument = argument[1:]
-                d = self.parenthetic_parse(argument)
-                a = self.argument_tree(d[1:-1])
+                d = _parenthetic_end(argument)
+                a = self.argument_tree(argument, 1, d - 1)
                 func = a[0]
                 args = a[1:]
                 
@@ -1217,7 +2366,7 @@ class Netbyte(object):
                     args = ()
                 
                 else:
-                    args = tuple(map(self.parse_arg, filter(lambda x: len(x) > 0, args)))
+                    args = tuple(self.parse_arg(a) for a in args if a)
                     
                 res = Operation(self, "FPCALL", self.parse_arg(func), *args)
                 return res
@@ -1242,29 +2391,25 @@ class Netbyte(object):
                     args = ()
                 
                 else:
-                    args = tuple(map(self.parse_arg,
-                        filter(lambda x: len(x) > 0, self.argument_tree(argument[1:-1].strip(' ')))
-                    ))
+                    args = tuple(self.parse_arg(a) for a in self.argument_tree(argument[1:-1].strip(' ')) if a)
                     
-                return Operation(self, "FNCALL", Literal(self, name), Literal(self, scope), *args)
+                return Operation(self, "FNCALL", Literal(self, _intern_name(name)), Literal(self, _intern_name(scope)), *args)
             
             elif argument[0] == "{" and argument[-1] == "}":
-                argument = argument[1:-1].strip(' ')
-                args = list(map(self.parse_arg, filter(lambda x: len(x) > 0, self.argument_tree(' '.join(argument.split(' ')[1:])))))
+                opcode, _, rest = argument[1:-1].strip(' ').partition(' ')
+                args = [self.parse_arg(a) for a in self.argument_tree(rest) if a]
             
                 return Instruction(
                     self, None,
-                    argument.split(' ')[0].upper(),
+                    sys.intern(opcode.upper()),
                     *args
                 )
                 
             elif argument[0] == "(" and argument[-1] == ")":
-                argument = argument[1:-1].strip(' ')
-                
-                code = argument.split(' ')[0]    
-                args = tuple(map(self.parse_arg, filter(lambda x: len(x) > 0, self.argument_tree(' '.join(argument.split(' ')[1:])))))
+                code, _, rest = argument[1:-1].strip(' ').partition(' ')
+                args = tuple(self.parse_arg(a) for a in self.argument_tree(rest) if a)
             
-                return Operation(self, code.upper(), *args)
+                return Operation(self, sys.intern(code.upper()), *args)
                 
             elif argument[0] == "[" and argument[-1] == "]":
                 argument = argument[1:-1].strip(' ')
@@ -1298,31 +2443,14 @@ class Netbyte(object):
             elif argument.upper() == "FALSE":
                 return Literal(self, False)
                 
-            elif len(tuple(filter(lambda x: x in '0123456789', argument))) == len(argument):
+            elif _INT_LITERAL.fullmatch(argument):
                 return Literal(self, int(argument))
                 
-            elif len(tuple(filter(lambda x: x in '0123456789', argument[1:]))) == len(argument[1:]) and argument.startswith('-'):
-                return Literal(self, -int(argument[1:]))
-                
-            elif argument.count('.') == 1 \
-                    and len(tuple(filter(lambda x: x in '0123456789', argument.split('.')[0]))) == len(argument.split('.')[0])\
-                    and len(tuple(filter(lambda x: x in '0123456789', argument.split('.')[1]))) == len(argument.split('.')[1]):
+            elif _FLOAT_LITERAL.fullmatch(argument):
                 return Literal(self, float(argument))
                 
-            elif argument[1:].count('.') == 1 \
-                    and len(tuple(filter(lambda x: x in '0123456789', argument[1:].split('.')[0]))) == len(argument[1:].split('.')[0])\
-                    and len(tuple(filter(lambda x: x in '0123456789', argument[1:].split('.')[1]))) == len(argument[1:].split('.')[1])\
-                    and argument.startswith('-'):
-                return Literal(self, -float(argument[1:]))
-                
-            elif argument.startswith('0x') and len(filter(lambda x: x in '0123456789ABCDEF', argument[2:])) == len(argument) - 2:
-                return Literal(self, int(argument[2:], 16))
-                
-            elif argument.startswith('0o') and len(filter(lambda x: x in '01234567', argument[2:])) == len(argument) - 2:
-                return Literal(self, int(argument[2:], 8))
-                
-            elif argument.startswith('0b') and len(filter(lambda x: x in '01', argument[2:])) == len(argument) - 2:
-                return Literal(self, int(argument[2:], 2))
+            elif _BASED_LITERAL.fullmatch(argument):
+                return Literal(self, int(argument, 0))
                 
             elif argument.startswith('@'):
                 return FunctionPointer(self, argument[1:])
@@ -1353,7 +2481,7 @@ class Netbyte(object):
                         
                     argument = argument[1:]
             
-                return Operation(self, "GETVAR", Literal(self, name), Literal(self, scope))
+                return Operation(self, "GETVAR", Literal(self, _intern_name(name)), Literal(self, _intern_name(scope)))
                     
         return Literal(self, None)
                     
@@ -1362,13 +2490,19 @@ class Netbyte(object):
             included = []
     
         instructions = []
-        assembly = re.sub(r'//[^\n]+', '', assembly)
-        assembly = re.sub(r' +', ' ', assembly)
-        assembly = re.sub(r' ?/\*[\n.]*?\*/ ?', '', assembly, flags=re.S)
+        assembly = _LINE_COMMENT_OR_SPACES.sub(r'\1', assembly)
+        
+        # the other passes are skipped when there's nothing for them to match
+        if '/*' in assembly:
+            assembly = _BLOCK_COMMENT.sub('', assembly)
+            
         _asm = assembly
-        assembly = re.sub(r'\\\s*?\n', '', assembly)
+        
+        if '\\' in assembly:
+            assembly = _LINE_CONTINUATION.sub('', assembly)
     
         semicolons = False
+        warned = set() # unknown opcodes already reported for this source
     
         for l in assembly.splitlines():
             if l.startswith("#"):
@@ -1408,20 +2542,23 @@ class Netbyte(object):
                         raise PreprocessingError("#STDINCLUDE needs a module. E.g. \"#STDINCLUDE file\"")
                 
             elif not semicolons:
-                l = l.replace('\\\n', ' ')
-                l = l.strip(' ')
+                l = l.strip(' ') # lines from splitlines() hold no newline to replace
             
-                if re.sub(r'^\s+$', '', l) == '':
+                if not l or l.isspace():
                     continue
             
-                opcode = l.split(' ')[0]
+                opcode, _, rest = l.partition(' ')
+                
+                code = sys.intern(opcode.upper())
                 
-                if opcode.upper() not in BASE_OPCODES:
+                # a script with a bad opcode tends to repeat it on many lines
+                if code not in _BASE_ID and opcode not in warned:
+                    warned.add(opcode)
                     warnings.warn("Code @ '{}': {} is not a valid opcode!".format(name, opcode))
                 
-                arguments = tuple(map(self.parse_arg, filter(lambda x: len(x) > 0, self.argument_tree(' '.join(l.split(' ')[1:])))))
+                arguments = tuple(self.parse_arg(a) for a in self.argument_tree(rest) if a)
                 # print(arguments)
-                instructions.append(Instruction(self, None, opcode.upper(), *arguments))
+                instructions.append(Instruction(self, None, code, *arguments))
         
         if semicolons:
             lines = []
@@ -1432,22 +2569,30 @@ class Netbyte(object):
                     
             _asm = '\n'.join(lines)
         
-            for l in re.split(r'(?<!\\);', _asm):
-                l = re.sub('\s+', ' ', l.replace('\n', ' ').strip(' '))
+            # the lookbehind is only needed when some semicolon is escaped
+            for l in (_STATEMENT_END.split(_asm) if '\\;' in _asm else _asm.split(';')):
+                l = _WHITESPACE.sub(' ', l.replace('\n', ' ').strip(' '))
             
-                if re.sub(r'^\s+$', '', l) == '':
+                if not l or l.isspace():
                     continue
             
-                opcode = l.split(' ')[0]
+                opcode, _, rest = l.partition(' ')
                 
-                if opcode.upper() not in BASE_OPCODES:
+                code = sys.intern(opcode.upper())
+                
+                # a script with a bad opcode tends to repeat it on many lines
+                if code not in _BASE_ID and opcode not in warned:
+                    warned.add(opcode)
                     warnings.warn("Code @ '{}': {} is not a valid opcode!".format(name, opcode))
                 
-                arguments = tuple(map(self.parse_arg, filter(lambda x: len(x) > 0, self.argument_tree(' '.join(l.split(' ')[1:])))))
+                arguments = tuple(self.parse_arg(a) for a in self.argument_tree(rest) if a)
                 # print(arguments)
-                instructions.append(Instruction(self, None, opcode.upper(), *arguments))
+                instructions.append(Instruction(self, None, code, *arguments))
         
         return instructions
         
     def parse_file(self, filename, included=None):
-        return self.parse(open(filename).read(), filename, included)
\ No newline at end of file
+        with open(filename, encoding='utf-8') as f:
+            source = f.read()
+            
+        return self.parse(source, filename, included)
\ No newline at end of file
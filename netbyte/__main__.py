@@ -22,7 +22,11 @@ def compile():
         open((sys.argv[3] if len(sys.argv) > 3 else sys.argv[2][:-1] + 'e'), "wb").write(nbe.compile(*nbe.parse_file(sys.argv[2]), debug=True))
         
 def run():
-    res = netbyte.Netbyte().execute((open(sys.argv[2], 'rb').read() if len(sys.argv) > 2 else sys.stdin.read()), (sys.argv[2] if len(sys.argv) > 2 else "<stdin>"))
+    if len(sys.argv) > 2:
+        res = netbyte.Netbyte().execute_file(sys.argv[2])
+        
+    else:
+        res = netbyte.Netbyte().execute(sys.stdin.buffer.read(), "<stdin>")
 
     if res is not None:
         print("[File return value: '{}']".format(res))
@@ -0,0 +1,251 @@
+import glob
+import io
+import os
+import sys
+import tempfile
+import unittest
+
+import netbyte
+from netbyte import Function, FunctionPointer, Instruction, Literal, Operation
+
+
+FOLDER = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "netbyte")
+os.environ.setdefault("NETBYTE_FOLDER", FOLDER)
+
+# as dumped before the dumper wrote into a single bytearray
+MIXED = "\n".join((
+    'SETVAR "a" [1 2.5 "x" true null [3 4]]',
+    'SETVAR "n" (ADDNUM 127 128 32768 2147483648)',
+    'MKFUNC "f" null {SETVAR "y" (MULNUM %0 2)} {RETURN (CONCAT y "!")}',
+    'PRINTV (FNCALL "f" null 3) ::n %1 false (GETVAR "a" "")',
+))
+
+MIXED_BYTECODE = bytes.fromhex(
+    "0500302e312e3617000000000800000000010000000561000600000000010000"
+    "00084900000000080000000001000000056e0038000000260700000000010000"
+    "00017f0800000000020000000180000a000000000400000001008000000e0000"
+    "0000080000000100000080000000008d00000003080000000001000000056600"
+    "06000000000100000000370000000032000000062d0000000008000000000100"
+    "00000579001c000000280c000000060700000000010000000100070000000001"
+    "0000000102370000000032000000062d00000004280000003517000000040800"
+    "0000000100000005790006000000000100000000080000000001000000052100"
+    "7a0000000b220000000808000000000100000005660006000000000100000000"
+    "07000000000100000001031800000004080000000001000000056e0007000000"
+    "000000000005000c000000060700000000010000000101070000000002000000"
+    "070018000000040800000000010000000561000700000000000000000500"
+)
+
+def compiled(source):
+    env = netbyte.Netbyte(io.BytesIO())
+    return env, env.compile(*env.parse(source))
+
+def instruction_ends(data):
+    # after the version header, each instruction is its U32 length and body
+    pos = 2 + len(netbyte.Netbyte.VERSION)
+    
+    while pos < len(data):
+        pos += 4 + netbyte._U32.unpack_from(data, pos)[0]
+        yield pos
+
+def tree(node):
+    # the parts of a node that make it up, for comparing what was read back
+    t = type(node)
+    
+    if t is Instruction:
+        return ("I", node.opcode, node.scope, tuple(map(tree, node.arguments)))
+    
+    if t is Operation:
+        return ("O", node.operator, node.scope, tuple(map(tree, node.operands)))
+    
+    if t is FunctionPointer:
+        return ("P", node.fname, node.fscope)
+    
+    if t is Literal and type(node.value) in (list, tuple):
+        return ("L", type(node.value), tuple(map(tree, node.value)))
+    
+    if t is Literal and type(node.value) is Function:
+        return ("F", node.value.name, node.value.scope, tuple(map(tree, node.value.instructions)))
+    
+    if t is Literal:
+        return ("L", type(node.value), node.value)
+    
+    return node
+
+
+class TruncatedCodeTest(unittest.TestCase):
+    def check(self, source):
+        env, data = compiled(source)
+        ends = set(instruction_ends(data))
+        
+        # cutting between two instructions leaves a shorter program
+        for end in range(8, len(data)):
+            if end in ends:
+                continue
+                
+            with self.subTest(end=end):
+                env.pstream = io.BytesIO()
+                
+                with self.assertRaises(netbyte.TruncatedCodeError):
+                    env.execute(data[:end])
+                
+                # nothing ran before the error
+                self.assertEqual(env.pstream.getvalue(), b'')
+    
+    def test_streamed(self):
+        self.check('PRINTV "side effect"\nPRINTV "second"\nRETURN 1')
+    
+    def test_with_jumps(self):
+        self.check('PRINTV "side effect"\nMLABEL "a"\nPRINTV "second"\nRETURN 1')
+    
+    def test_whole(self):
+        env, data = compiled('PRINTV "side effect"\nPRINTV "second"\nRETURN 1')
+        self.assertEqual(env.execute(data), 1)
+        self.assertEqual(env.pstream.getvalue(), b'side effect\nsecond\n')
+
+
+class DumperTest(unittest.TestCase):
+    def test_bundled_programs(self):
+        # the .nbe files were compiled by the original dumper
+        for fn in sorted(glob.glob(os.path.join(FOLDER, "Programs", "*.nbc"))):
+            with self.subTest(fn=os.path.basename(fn)):
+                env = netbyte.Netbyte(io.BytesIO())
+                
+                with open(fn[:-1] + "e", "rb") as fp:
+                    self.assertEqual(env.compile(*env.parse_file(fn)), fp.read())
+    
+    def test_mixed_literals(self):
+        self.assertEqual(compiled(MIXED)[1], MIXED_BYTECODE)
+
+
+class RoundTripTest(unittest.TestCase):
+    def check(self, env, instructions):
+        read = env.read(env.compile(*instructions))
+        self.assertEqual(list(map(tree, read)), list(map(tree, instructions)))
+    
+    def test_arrays(self):
+        env = netbyte.Netbyte(io.BytesIO())
+        self.check(env, env.parse("\n".join((
+            'SETVAR "a" [1 [2.5 "héllo" [true null]] "ü"]',
+            'PRINTV [(ADDNUM 1 2) x [y]] [0]',
+        ))))
+    
+    def test_function_pointers(self):
+        env = netbyte.Netbyte(io.BytesIO())
+        self.check(env, env.parse("\n".join((
+            'MKFUNC "foo" null {RETURN (MULNUM %0 2)}',
+            'SETVAR "p" @foo',
+            'PRINTV [@foo 1] (FNCALL p null 3)',
+        ))))
+    
+    def test_function_literals(self):
+        # the parser never makes these, but the reader does for FUNCTN
+        env = netbyte.Netbyte(io.BytesIO())
+        
+        # the reader puts the body in the function's scope
+        body = (
+            Instruction(env, "sc", "PRINTV", Literal(env, "fün"), Operation(env, "GETARG", Literal(env, 0), scope="sc")),
+            Instruction(env, "sc", "RETURN", Operation(env, "ADDNUM", Literal(env, 1), Literal(env, 2), scope="sc")),
+        )
+        
+        self.check(env, [
+            Instruction(env, None, "SETVAR", Literal(env, "g"), Literal(env, Function(env, "sc", "nämé", *body))),
+            Instruction(env, None, "PRINTV", Literal(env, [Literal(env, Function(env, "", "h"))])),
+        ])
+
+
+class NestingTest(unittest.TestCase):
+    def test_run(self):
+        env, data = compiled("RETURN " + "(ADDNUM " * 200 + "0" + " 1)" * 200)
+        self.assertEqual(env.execute(data), 200)
+    
+    def test_deeper_than_the_recursion_limit(self):
+        env = netbyte.Netbyte(io.BytesIO())
+        op = Literal(env, 0)
+        
+        for _ in range(3000):
+            op = Operation(env, "ADDNUM", op, Literal(env, 1))
+        
+        # only the dumper still recurses
+        limit = sys.getrecursionlimit()
+        sys.setrecursionlimit(20000)
+        
+        try:
+            data = env.compile(Instruction(env, None, "RETURN", op))
+            
+        finally:
+            sys.setrecursionlimit(limit)
+        
+        node = env.read(data)[0].arguments[0]
+        depth = 0
+        
+        while type(node) is Operation:
+            self.assertEqual(node.operator, "ADDNUM")
+            self.assertEqual(tree(node.operands[1]), ("L", int, 1))
+            node = node.operands[0]
+            depth += 1
+        
+        self.assertEqual(depth, 3000)
+        self.assertEqual(tree(node), ("L", int, 0))
+
+
+class MapFileTest(unittest.TestCase):
+    def write(self, source):
+        env, data = compiled(source)
+        
+        with tempfile.NamedTemporaryFile(suffix=".nbe", delete=False) as fp:
+            fp.write(data)
+            
+        self.addCleanup(os.unlink, fp.name)
+        return env, fp.name
+    
+    def test_closed_after_reading(self):
+        env, fn = self.write('PRINTV "héllo" [1 "ü"]\nRETURN 3')
+        
+        with netbyte.map_file(fn) as data:
+            instructions = env.read(data, fn)
+            
+        self.assertTrue(data.closed)
+        self.assertEqual(env.execute(env.compile(*instructions)), 3)
+    
+    def test_execute_file(self):
+        env, fn = self.write('MLABEL "a"\nPRINTV "side effect"\nRETURN 3')
+        self.assertEqual(env.execute_file(fn), 3)
+        self.assertEqual(env.pstream.getvalue(), b'side effect\n')
+    
+    def test_closed_after_an_error(self):
+        # the error still comes out, not the map's BufferError
+        for source in ('PRINTV "a"\nPRINTV (ADDNUM 1 "x")', 'MLABEL "a"\nPRINTV (ADDNUM 1 "x")'):
+            with self.subTest(source=source):
+                env, fn = self.write(source)
+                
+                with self.assertRaises(TypeError):
+                    with netbyte.map_file(fn) as data:
+                        env.execute(data, fn)
+                        
+                self.assertTrue(data.closed)
+
+
+class IntegerWidthTest(unittest.TestCase):
+    def test_widths(self):
+        cases = (
+            (0, 1), (127, 1), (-128, 1), (128, 2), (-129, 2),
+            (32767, 2), (-32768, 2), (32768, 4), (-32769, 4),
+            (2 ** 31 - 1, 4), (-2 ** 31, 4), (2 ** 31, 8), (-2 ** 31 - 1, 8),
+            (2 ** 63 - 1, 8), (-2 ** 63, 8), (2 ** 63, 9), (-2 ** 63 - 1, 9),
+            (2 ** 100, 13), (-2 ** 100, 13),
+        )
+        
+        for value, width in cases:
+            with self.subTest(value=value):
+                self.assertEqual(netbyte._int_width(value), width)
+    
+    def test_round_trip(self):
+        values = (0, 1, -1, 127, 128, -128, -129, 40000, -40000, 2 ** 31, -2 ** 31 - 1, 2 ** 63 - 1, -2 ** 63, 2 ** 63, -2 ** 63 - 1, 3 ** 90, -3 ** 90)
+        env, data = compiled("\n".join('GSTVAR "v{}" {}'.format(i, v) for i, v in enumerate(values)))
+        env.execute(data)
+        
+        self.assertEqual([env.variables[("", "v{}".format(i))] for i in range(len(values))], list(values))
+
+
+if __name__ == '__main__':
+    unittest.main()
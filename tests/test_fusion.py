@@ -0,0 +1,72 @@
+import io
+import os
+import unittest
+
+import netbyte
+
+
+FOLDER = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "netbyte")
+
+def run(source):
+    out = io.BytesIO()
+    env = netbyte.Netbyte(out)
+    res = env.execute(env.compile(*env.parse(source)))
+    return res, out.getvalue().decode('utf-8').split("\n")
+
+
+class FusedRunTest(unittest.TestCase):
+    def check(self, source):
+        # the same program with every instruction run on its own
+        fuse_max = netbyte._FUSE_MAX
+        netbyte._FUSE_MAX = 1
+        
+        try:
+            expected = run(source)
+        
+        finally:
+            netbyte._FUSE_MAX = fuse_max
+        
+        result = run(source)
+        self.assertEqual(result, expected)
+        return result
+    
+    def test_example_loop(self):
+        # MLABEL "Loop" is followed by a run of four straight-line instructions
+        with open(os.path.join(FOLDER, "Programs", "example.nbc")) as fp:
+            res, printed = self.check(fp.read())
+        
+        self.assertEqual(res, 10800)
+        self.assertEqual(printed.count("--- Iteration #6 Finished ---"), 1)
+        self.assertEqual(sum(1 for l in printed if l.startswith("Added")), 6 * 58)
+    
+    def test_offset_jump_into_a_run(self):
+        # JMPOFF lands on the third instruction of the run it jumps back to
+        _, printed = self.check("\n".join((
+            'SETVAR "i" 0',
+            'SETVAR "a" 0',
+            'SETVAR "a" (ADDNUM a 10)',
+            'SETVAR "i" (ADDNUM i 1)',
+            'PRINTV i a',
+            'JMPOFF (SUBNUM 1 (MULNUM (LSRTHN i 3) 4))',
+            'PRINTV "done"',
+        )))
+        
+        self.assertEqual(printed[:-1], ["1 10", "2 20", "3 30", "done"])
+    
+    def test_global_jump_from_a_call(self):
+        # the call is in the middle of a fused run, whose rest must be skipped
+        _, printed = self.check("\n".join((
+            'GSTVAR "n" 0',
+            'MKFUNC "back" null {JUMPIF (LOGNOT (LSRTHN ::n 3)) "End"} {GJUMPL "Top" ""} {MLABEL "End"}',
+            'MLABEL "Top"',
+            'GSTVAR "n" (ADDNUM n 1)',
+            'PRINTV n',
+            'NULLEV back()',
+            'PRINTV "after" n',
+        )))
+        
+        self.assertEqual(printed[:-1], ["1", "2", "3", "after 3"])
+
+
+if __name__ == '__main__':
+    unittest.main()
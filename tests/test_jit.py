@@ -0,0 +1,86 @@
+import io
+import unittest
+
+import netbyte
+
+
+def define(source, threshold=3):
+    env = netbyte.Netbyte(io.BytesIO())
+    env.JIT_THRESHOLD = threshold
+    env.execute(env.compile(*env.parse(source)))
+    return env, env.functions[("", "f")]
+
+def calls(function, arguments):
+    # each call's result, or the exception type and message
+    results = []
+    
+    for args in arguments:
+        try:
+            results.append(function.execute(*args))
+        
+        except Exception as e:
+            results.append((type(e), str(e)))
+    
+    return results
+
+
+class CompiledFunctionTest(unittest.TestCase):
+    def check(self, source, arguments):
+        # the same calls, interpreted throughout and compiled after the third
+        _, interpreted = define(source, 0)
+        expected = calls(interpreted, arguments)
+        
+        _, compiled = define(source)
+        results = calls(compiled, arguments)
+        
+        self.assertIsNone(interpreted._compiled)
+        self.assertIsNotNone(compiled._compiled)
+        self.assertEqual(results, expected)
+        return results
+    
+    def test_arithmetic(self):
+        self.check('GSTVAR "k" 5\nMKFUNC "f" null {SETVAR "y" (MULNUM %0 2)} {RETURN (ADDNUM y ::k %0)}', [(i,) for i in range(8)])
+    
+    def test_strings_are_rejected_by_addnum(self):
+        results = self.check('MKFUNC "f" null {RETURN (ADDNUM %0 %1)}', [("a", "b")] * 6)
+        self.assertEqual(results[0][0], TypeError)
+    
+    def test_missing_variable(self):
+        # the KeyError names the variable, compiled or not
+        _, f = define('MKFUNC "f" null {RETURN (ADDNUM ::missing 1)}')
+        results = calls(f, [()] * 6)
+        
+        self.assertIsNotNone(f._compiled)
+        self.assertEqual(results[0][0], KeyError)
+        self.assertIn("no such variable 'missing' in scope ''", results[0][1])
+        self.assertEqual(results[-1], results[0])
+    
+    def test_threshold_per_environment(self):
+        env, f = define('MKFUNC "f" null {RETURN 1}', 5)
+        self.assertEqual(netbyte.Netbyte.JIT_THRESHOLD, 1000)
+        
+        calls(f, [()] * 4)
+        self.assertIsNone(f._compiled)
+        calls(f, [()])
+        self.assertIsNotNone(f._compiled)
+    
+    def test_variable_defined_after_compiling(self):
+        env, f = define('MKFUNC "f" null {RETURN (ADDNUM ::late 1)}')
+        self.assertEqual(calls(f, [()] * 4)[-1][0], KeyError)
+        self.assertIsNotNone(f._compiled)
+        
+        env.variables[("", "late")] = 41
+        self.assertEqual(f.execute(), 42)
+    
+    def test_scope_set_after_compiling(self):
+        env, f = define('SETVAR "x" 1\nMKFUNC "f" null {RETURN (ADDNUM x 1)}')
+        self.assertEqual(calls(f, [()] * 4), [2] * 4)
+        
+        env.variables[("other", "x")] = 10
+        f.instructions[0].arguments[0].operands[0].scope = "other"
+        
+        self.assertEqual(f.execute(), 11)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,79 @@
+import io
+import unittest
+
+import netbyte
+
+
+# eight pure operators over one leaf, enough for the tree to keep a memo
+TREE = "(ADDNUM (MULNUM {0} 3) (SUBNUM {0} 1) (MODNUM {0} 7) (MAXNUM {0} 2) (MINNUM {0} 9) (LFTNUM {0} 1) (ANDNUM {0} 5))"
+
+def tree(x):
+    return x * 3 + (x - 1) + x % 7 + max(x, 2) + min(x, 9) + (x << 1) + (x & 5)
+    
+def run(source):
+    out = io.BytesIO()
+    env = netbyte.Netbyte(out)
+    res = env.execute(env.compile(*env.parse(source)))
+    return res, out.getvalue().decode('utf-8').split()
+    
+    
+class MemoTest(unittest.TestCase):
+    def test_setvar_changes_the_result(self):
+        # values repeat, so later rounds are answered from the memo
+        _, printed = run("\n".join((
+            'SETVAR "i" 0',
+            'MLABEL "Loop"',
+            'SETVAR "x" (MODNUM i 5)',
+            'PRINTV ' + TREE.format("x"),
+            'SETVAR "i" (ADDNUM i 1)',
+            'JUMPIF (LSRTHN i 30) "Loop"',
+        )))
+        
+        self.assertEqual(printed, [str(tree(i % 5)) for i in range(30)])
+        
+    def test_forall_body(self):
+        # FORALL sets the body's scope again on every evaluation
+        _, printed = run("\n".join((
+            'SETVAR "i" 0',
+            'MLABEL "Loop"',
+            'SETVAR "y" (MODNUM i 4)',
+            'GSTVAR "acc" 0',
+            'NULLEV (FORALL (NFCALL "range" null 1 4) {GSTVAR "acc" (ADDNUM ::acc ' + TREE.format("::y") + ')})',
+            'PRINTV acc',
+            'SETVAR "i" (ADDNUM i 1)',
+            'JUMPIF (LSRTHN i 12) "Loop"',
+        )))
+        
+        self.assertEqual(printed, [str(3 * tree(i % 4)) for i in range(12)])
+        
+    def test_nested_trees(self):
+        # both the outer tree and the ones inside it keep a memo
+        _, printed = run("\n".join((
+            'SETVAR "i" 0',
+            'MLABEL "Loop"',
+            'SETVAR "x" (MODNUM i 3)',
+            'SETVAR "y" (MODNUM i 4)',
+            'PRINTV (SUBNUM ' + TREE.format("x") + ' ' + TREE.format("y") + ')',
+            'SETVAR "i" (ADDNUM i 1)',
+            'JUMPIF (LSRTHN i 24) "Loop"',
+        )))
+        
+        self.assertEqual(printed, [str(tree(i % 3) - tree(i % 4)) for i in range(24)])
+        
+    def test_reassigning_the_same_scope_keeps_the_variable_key(self):
+        env = netbyte.Netbyte(io.BytesIO())
+        env.variables[("", "x")] = 4
+        op = env.parse_arg("x")
+        
+        self.assertEqual(op.__value__(), 4)
+        key = op._var_key
+        
+        op.scope = op.scope
+        self.assertIs(op._var_key, key)
+        
+        op.scope = "other"
+        self.assertIsNone(op._var_key)
+        
+        
+if __name__ == '__main__':
+    unittest.main()
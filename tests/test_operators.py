@@ -0,0 +1,35 @@
+import io
+import unittest
+
+import netbyte
+
+
+def run(source):
+    env = netbyte.Netbyte(io.StringIO())
+    return env.execute(env.compile(*env.parse(source)))
+
+
+class AddnumArityTest(unittest.TestCase):
+    # the two-operand specializations must agree with the n-ary path
+    
+    def test_strings_are_rejected_at_any_arity(self):
+        for source in (
+            'RETURN (ADDNUM "x" "y")',
+            'RETURN (ADDNUM "x" "y" "z")',
+            'SETVAR "a" "x"\nRETURN (ADDNUM a "y")',
+            'SETVAR "a" "x"\nSETVAR "b" "y"\nRETURN (ADDNUM a b)',
+        ):
+            with self.subTest(source=source):
+                self.assertRaises(TypeError, run, source)
+                
+    def test_negative_zero_sum(self):
+        self.assertEqual(str(run('SETVAR "a" -0.0\nRETURN (ADDNUM a -0.0)')), "0.0")
+        self.assertEqual(str(run('SETVAR "a" -0.0\nRETURN (ADDNUM a -0.0 -0.0)')), "0.0")
+        
+    def test_numbers(self):
+        self.assertEqual(run('SETVAR "a" 2\nRETURN (ADDNUM a 3)'), 5)
+        self.assertEqual(run('SETVAR "a" 2\nRETURN (ADDNUM a a a)'), 6)
+        
+        
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,127 @@
+import io
+import unittest
+import warnings
+
+import netbyte
+
+
+def literal(env, argument):
+    arg = env.parse_arg(argument)
+    return (type(arg.value), arg.value) if type(arg) is netbyte.Literal else arg.operator
+
+def statements(env, source):
+    return [(i.opcode, literals(i.arguments)) for i in env.parse(source)]
+
+def literals(arguments):
+    return [a.value if type(a) is netbyte.Literal else a.operator for a in arguments]
+
+
+class ArgumentTreeTest(unittest.TestCase):
+    def setUp(self):
+        self.env = netbyte.Netbyte(io.BytesIO())
+    
+    def test_separators(self):
+        self.assertEqual(self.env.argument_tree('x,y  z'), ["x", "y", "", "z"])
+        self.assertEqual(self.env.argument_tree('a '), ["a"])
+        self.assertEqual(self.env.argument_tree(''), [])
+    
+    def test_quotes(self):
+        self.assertEqual(self.env.argument_tree('"a b" 1'), ['"a b"', "1"])
+        # either quote character toggles quoting
+        self.assertEqual(self.env.argument_tree("'a\" b' c"), ["'a\"", "b' c"])
+    
+    def test_brackets(self):
+        self.assertEqual(self.env.argument_tree('(ADDNUM 1 2) x'), ["(ADDNUM 1 2)", "", "x"])
+        self.assertEqual(self.env.argument_tree('[1 2 [3]] {PRINTV "}"}'), ["[1 2 [3]]", "", '{PRINTV "}"}'])
+        self.assertEqual(self.env.argument_tree('f(1, 2) g'), ["f(1, 2)", "", "g"])
+        self.assertEqual(self.env.argument_tree('(a)(b)'), ["(a)", "(b)"])
+    
+    def test_bracket_inside_quotes_opens_a_group(self):
+        self.assertEqual(self.env.argument_tree('"(" x'), ['"(" x'])
+    
+    def test_parenthetic_parse(self):
+        self.assertEqual(self.env.parenthetic_parse('(ADDNUM (MULNUM 1 2) 3) x'), "(ADDNUM (MULNUM 1 2) 3)")
+        self.assertEqual(self.env.parenthetic_parse('{PRINTV ")"} x'), '{PRINTV ")"}')
+        self.assertEqual(self.env.parenthetic_parse('"a b" 1'), '"a b" 1')
+
+
+class LiteralTest(unittest.TestCase):
+    def setUp(self):
+        self.env = netbyte.Netbyte(io.BytesIO())
+    
+    def check(self, cases):
+        for argument, expected in cases:
+            with self.subTest(argument=argument):
+                self.assertEqual(literal(self.env, argument), expected)
+    
+    def test_ints(self):
+        self.check((("5", (int, 5)), ("-5", (int, -5)), ("007", (int, 7))))
+    
+    def test_floats(self):
+        self.check((("1.25", (float, 1.25)), ("5.", (float, 5.0)), (".5", (float, 0.5)), ("-.5", (float, -0.5))))
+    
+    def test_based_ints(self):
+        self.check((("0xff", (int, 255)), ("0xFF", (int, 255)), ("0xAb", (int, 171)), ("0o17", (int, 15)), ("0b101", (int, 5))))
+        self.check((("0x", "GETVAR"), ("0o8", "GETVAR"), ("0b12", "GETVAR"), ("0xg", "GETVAR")))
+    
+    def test_not_numbers(self):
+        # these used to reach int() or float(); they are variable names now
+        self.check((("-", "GETVAR"), (".", "GETVAR"), ("\u00b2", "GETVAR"), ("1.2.3", "GETVAR"), ("12a", "GETVAR")))
+
+
+class CleanupTest(unittest.TestCase):
+    def setUp(self):
+        self.env = netbyte.Netbyte(io.BytesIO())
+    
+    def test_line_comments(self):
+        self.assertEqual(statements(self.env, 'PRINTV 1 2 // comment'), [("PRINTV", [1, 2])])
+        self.assertEqual(statements(self.env, '//only\nPRINTV 3 //x\nPRINTV 4'), [("PRINTV", [3]), ("PRINTV", [4])])
+        self.assertEqual(statements(self.env, 'PRINTV "x" // a  b // c'), [("PRINTV", ["x"])])
+    
+    def test_space_runs_collapse(self):
+        self.assertEqual(statements(self.env, 'PRINTV   1     2'), [("PRINTV", [1, 2])])
+        # strings included
+        self.assertEqual(statements(self.env, 'PRINTV "a    b"'), [("PRINTV", ["a b"])])
+    
+    def test_line_continuation(self):
+        self.assertEqual(statements(self.env, 'PRINTV 1 \\\n 2'), [("PRINTV", [1, 2])])
+
+
+class SemicolonsTest(unittest.TestCase):
+    def setUp(self):
+        self.env = netbyte.Netbyte(io.BytesIO())
+    
+    def test_split(self):
+        self.assertEqual(statements(self.env, '#SEMICOLONS\nPRINTV 1; PRINTV 2'), [("PRINTV", [1]), ("PRINTV", [2])])
+        self.assertEqual(statements(self.env, '#SEMICOLONS\nPRINTV 1;\nPRINTV\n2;'), [("PRINTV", [1]), ("PRINTV", [2])])
+    
+    def test_escaped_semicolon(self):
+        # the escape doesn't end the statement, and is kept in the string
+        self.assertEqual(statements(self.env, '#SEMICOLONS\nPRINTV "a\\;b"; PRINTV 2'), [("PRINTV", ["a\\;b"]), ("PRINTV", [2])])
+
+
+class UnknownOpcodeTest(unittest.TestCase):
+    def warnings(self, env, source):
+        with warnings.catch_warnings(record=True) as caught:
+            warnings.simplefilter("always")
+            env.parse(source, "src")
+        
+        return [str(w.message) for w in caught]
+    
+    def test_once_per_parse(self):
+        env = netbyte.Netbyte(io.BytesIO())
+        source = "FOOBAR 1\nFOOBAR 2\nBARFOO\nPRINTV 1"
+        expected = ["Code @ 'src': FOOBAR is not a valid opcode!", "Code @ 'src': BARFOO is not a valid opcode!"]
+        
+        self.assertEqual(self.warnings(env, source), expected)
+        # a later parse reports them again
+        self.assertEqual(self.warnings(env, source), expected)
+        self.assertEqual(self.warnings(netbyte.Netbyte(io.BytesIO()), source), expected)
+    
+    def test_semicolons(self):
+        env = netbyte.Netbyte(io.BytesIO())
+        self.assertEqual(self.warnings(env, "#SEMICOLONS\nFOOBAR; FOOBAR 1; PRINTV 1"), ["Code @ 'src': FOOBAR is not a valid opcode!"])
+
+
+if __name__ == '__main__':
+    unittest.main()